@@ -5,12 +5,23 @@ __author__ = "John Kirkham <kirkhamj@janelia.hhmi.org>"
 __date__ = "$Dec 08, 2016 15:26:16 GMT-0500$"
 
 
+import collections
+import copy
+import functools
 import itertools
 import math
+import numbers
 import operator
 import warnings
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 import kenjutsu.format
+import kenjutsu.measure
+import kenjutsu.operators
 
 
 def num_blocks(space_shape, block_shape):
@@ -103,7 +114,716 @@ def num_blocks(space_shape, block_shape):
     return tuple(n_blocks)
 
 
-def split_blocks(space_shape, block_shape, block_halo=None, index=None):
+def _block_slices(space_len, block_len, halo_len, i):
+    """
+        Computes the slices along one dimension for the block at ``i``.
+
+        Args:
+            space_len(int):                Length of the dimension
+            block_len(int):                Length of each block
+            halo_len(int):                 Halo to tack on to each block
+            i(int):                        Index of the block
+
+        Returns:
+            tuple(slice):                  The core, haloed, and trimmed
+                                           slices of the block.
+    """
+
+    start = i * block_len
+    stop = start + block_len
+
+    # Add the halo to the block on both sides.
+    haloed_start = min(max(start - halo_len, 0), space_len)
+    haloed_stop = min(max(stop + halo_len, 0), space_len)
+
+    # Compute how to trim the halo off of the block.
+    trimmed_start = start - haloed_start
+    trimmed_stop = stop - haloed_start
+
+    # Clip the block to the boundaries.
+    stop = min(stop, space_len)
+
+    # All bounds are non-negative and clipped. So they are already
+    # normalized.
+    return (
+        slice(start, stop, 1),
+        slice(haloed_start, haloed_stop, 1),
+        slice(trimmed_start, trimmed_stop, 1),
+    )
+
+
+def _hilbert_decode(code, bits, ndim):
+    """
+        Finds the index at a position along a Hilbert curve.
+
+        Uses Skilling's method (AIP Conf. Proc. 707, 381 (2004)) to fill a
+        cube with ``2 ** bits`` along each of ``ndim`` dimensions.
+    """
+
+    # Deal out the bits of the position into the transposed form.
+    x = ndim * [0]
+    for j in range(bits * ndim):
+        bit = (code >> (bits * ndim - 1 - j)) & 1
+        x[j % ndim] |= bit << (bits - 1 - j // ndim)
+
+    # Gray decode.
+    t = x[ndim - 1] >> 1
+    for i in range(ndim - 1, 0, -1):
+        x[i] ^= x[i - 1]
+    x[0] ^= t
+
+    # Undo excess work.
+    q = 2
+    while q != (1 << bits) and bits > 0:
+        p = q - 1
+        for i in range(ndim - 1, -1, -1):
+            if x[i] & q:
+                x[0] ^= p
+            else:
+                t = (x[0] ^ x[i]) & p
+                x[0] ^= t
+                x[i] ^= t
+        q <<= 1
+
+    return tuple(x)
+
+
+class BlockGrid(object):
+    """
+        A lazy grid of blocks covering an array or other.
+
+        Takes an array with ``space_shape`` and ``block_shape`` for every
+        dimension and a ``block_halo`` to extend each block on each side.
+        Rather than constructing every slicing up front like
+        ``split_blocks``, the slicings for a block are computed when it is
+        requested. So the memory used only depends on the number of
+        dimensions and not the number of blocks.
+
+        Each block is provided as a ``Block`` with its ``index`` in the
+        grid, the ``core`` slicing to cut the block out, the ``haloed``
+        slicing to cut out the block with its halo, and the ``trimmed``
+        slicing to remove the halo from a haloed block.
+
+        Blocks are visited in ``order``. Besides C and F order, blocks can
+        follow a Z-order (``"morton"``) or ``"hilbert"`` curve. These visit
+        neighboring blocks close together. So haloed blocks processed one
+        after the other share more data, which helps caching. Curves are
+        followed lazily when iterating. Indexing a grid with a curve order
+        counts the blocks in each part of the curve to find the block. So
+        neither keeps the order of all blocks.
+
+        Note:
+            Blocks on the boundary that cannot extend the full range will
+            be truncated to the largest block that will fit. This will raise
+            a warning, which can be converted to an exception, if needed.
+
+        Note:
+            Curves are laid over the smallest grid with a power of 2 blocks
+            along each dimension (a cube for ``"hilbert"``) with blocks
+            outside of the grid skipped. Parts of the curve outside of the
+            grid are skipped whole. So the cost only depends on the number
+            of blocks in the grid.
+
+        Args:
+            space_shape(tuple):            Shape of array to slice
+            block_shape(tuple):            Size of each block to take
+            block_halo(tuple):             Halo to tack on to each block
+            order(str):                    Order to visit the blocks in
+                                           (``"C"``, ``"F"``, ``"morton"``,
+                                           or ``"hilbert"``)
+
+        Examples:
+
+            >>> grid = BlockGrid((2, 3,), (1, 1,), (1, 1,))
+            >>> len(grid)
+            6
+            >>> grid.shape
+            (2, 3)
+            >>> grid[4]  #doctest: +NORMALIZE_WHITESPACE
+            Block(index=(1, 1),
+                  core=(slice(1, 2, 1), slice(1, 2, 1)),
+                  haloed=(slice(0, 2, 1), slice(0, 3, 1)),
+                  trimmed=(slice(1, 2, 1), slice(1, 2, 1)))
+            >>> grid[1, 2] == grid[-1]
+            True
+            >>> [b.index for b in grid[::2]]
+            [(0, 0), (0, 2), (1, 1)]
+            >>> grid = BlockGrid((4, 4), (1, 1), order="hilbert")
+            >>> [b.index for b in grid[:6]]
+            [(0, 0), (1, 0), (1, 1), (0, 1), (0, 2), (0, 3)]
+
+    """
+
+    orders = ("C", "F", "morton", "hilbert")
+
+    Block = collections.namedtuple(
+        "Block", ["index", "core", "haloed", "trimmed"]
+    )
+
+    Overlap = collections.namedtuple(
+        "Overlap", ["block", "space", "local", "roi"]
+    )
+
+    def __init__(self, space_shape, block_shape, block_halo=None, order="C"):
+        try:
+            irange = xrange
+        except NameError:
+            irange = range
+
+        try:
+            from itertools import ifilter, imap
+        except ImportError:
+            ifilter, imap = filter, map
+
+        if block_halo is not None:
+            if not (len(space_shape) == len(block_shape) == len(block_halo)):
+                raise ValueError(
+                    "The dimensions of `space_shape`, `block_shape`, and"
+                    " `block_halo` should be the same."
+                )
+        else:
+            if not (len(space_shape) == len(block_shape)):
+                raise ValueError(
+                   "The dimensions of `space_shape` and `block_shape` should"
+                   " be the same."
+                )
+
+            block_halo = len(space_shape) * (0,)
+
+        if not all(imap(lambda e: e > 0, space_shape)):
+            raise ValueError(
+                "Shape of the space must all be positive definite."
+                "Instead got: %s." % str(space_shape)
+            )
+
+        if not all(imap(lambda e: e > 0 or e == -1, block_shape)):
+            raise ValueError(
+                "Shape of the blocks must all be positive or -1."
+                "Instead got: %s." % str(block_shape)
+            )
+
+        if not all(imap(lambda e: e >= 0, block_halo)):
+            raise ValueError(
+                "Shape of the halo must all be positive semidefinite."
+                "Instead got: %s." % str(block_halo)
+            )
+
+        if order not in BlockGrid.orders:
+            raise ValueError(
+                "The `order` must be one of %s. Instead got: %s." %
+                (", ".join(BlockGrid.orders), str(order))
+            )
+
+        vec_mod = lambda a, b: imap(operator.mod, a, b)
+
+        vec_nonzero = lambda a: \
+                imap(lambda _: _[0], ifilter(lambda _: _[1], enumerate(a)))
+        vec_str = lambda a: imap(str, a)
+
+        uneven_block_division = tuple(vec_mod(space_shape, block_shape))
+
+        if any(uneven_block_division):
+            uneven_block_division_str = vec_nonzero(uneven_block_division)
+            uneven_block_division_str = vec_str(uneven_block_division_str)
+            uneven_block_division_str = ", ".join(uneven_block_division_str)
+
+            warnings.warn(
+                "Blocks will not evenly divide the array." +
+                " The following dimensions will be unevenly divided: %s." %
+                uneven_block_division_str,
+                RuntimeWarning
+            )
+
+        # Construct each block using the block size given. Allow to spill over.
+        block_shape = tuple(
+            s if b == -1 else b for s, b in zip(space_shape, block_shape)
+        )
+
+        self.space_shape = tuple(space_shape)
+        self.block_shape = block_shape
+        self.block_halo = tuple(block_halo)
+        self.shape = tuple(
+            len(irange(0, s, b)) for s, b in zip(space_shape, block_shape)
+        )
+
+        self.order = order
+
+        # Positions of the grid visited given as `start + i * step`.
+        self._start = 0
+        self._step = 1
+        self._count = functools.reduce(operator.mul, self.shape, 1)
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        try:
+            irange = xrange
+        except NameError:
+            irange = range
+
+        if self.order in ("C", "F") or self._step < 0:
+            for i in irange(self._count):
+                yield self._block(
+                    self._unravel(self._start + i * self._step)
+                )
+        else:
+            curve = itertools.islice(
+                self._icurve(), self._start, None, self._step
+            )
+            for each_index in itertools.islice(curve, self._count):
+                yield self._block(each_index)
+
+    def __getitem__(self, key):
+        try:
+            irange = xrange
+        except NameError:
+            irange = range
+
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self._count)
+
+            result = copy.copy(self)
+            result._start = self._start + start * self._step
+            result._step = self._step * step
+            result._count = len(irange(start, stop, step))
+
+            return result
+        elif isinstance(key, numbers.Integral):
+            if not (-self._count <= key < self._count):
+                raise IndexError("Block index out of range.")
+            if key < 0:
+                key += self._count
+
+            return self._block(self._unravel(self._start + key * self._step))
+        elif isinstance(key, tuple):
+            if len(key) != len(self.shape):
+                raise IndexError(
+                    "Expected an index with %i dimensions. Instead got `%s`."
+                    % (len(self.shape), str(key))
+                )
+
+            index = []
+            for each_i, each_n in zip(key, self.shape):
+                if not isinstance(each_i, numbers.Integral):
+                    raise TypeError(
+                        "Expected an integral type. Instead got `%s`." %
+                        str(each_i)
+                    )
+                if not (-each_n <= each_i < each_n):
+                    raise IndexError("Block index out of range.")
+                if each_i < 0:
+                    each_i += each_n
+                index.append(each_i)
+
+            return self._block(tuple(index))
+        else:
+            raise TypeError(
+                "Expected an integral, a tuple of integrals, or a slice."
+                " Instead got `%s`." % str(key)
+            )
+
+    def __repr__(self):
+        order = ""
+        if self.order != "C":
+            order = ", order=%s" % repr(self.order)
+
+        return "%s(%s, %s, %s%s)" % (
+            type(self).__name__,
+            str(self.space_shape),
+            str(self.block_shape),
+            str(self.block_halo),
+            order
+        )
+
+    def _points(self, points):
+        """
+            Validates points and provides them as an array of indices.
+        """
+
+        points = numpy.asarray(points)
+        if points.ndim != 2 or points.shape[1] != len(self.space_shape):
+            raise ValueError(
+                "Expected points with shape `(n, %i)`. Instead got `%s`." %
+                (len(self.space_shape), str(points.shape))
+            )
+        if points.size and not issubclass(points.dtype.type, numpy.integer):
+            raise TypeError(
+                "Expected points of integral type. Instead got `%s`." %
+                str(points.dtype)
+            )
+
+        points = points.astype(numpy.intp)
+        if ((points < 0) | (points >= self.space_shape)).any():
+            raise IndexError("Point out of range.")
+
+        return points
+
+    def locate(self, points):
+        """
+            Finds the block containing each point and where it is inside.
+
+            Args:
+                points(numpy.ndarray):     an array of points with a row
+                                           for each point.
+
+            Returns:
+                (tuple(numpy.ndarray)):    the index of the block in the
+                                           grid and the offset in the core
+                                           of the block for each point.
+
+            Examples:
+
+                >>> grid = BlockGrid((12, 10), (4, 5), (1, 1))
+                >>> index, offset = grid.locate([[0, 0], [9, 7], [4, 9]])
+                >>> index.tolist()
+                [[0, 0], [2, 1], [1, 1]]
+                >>> offset.tolist()
+                [[0, 0], [1, 2], [0, 4]]
+        """
+
+        points = self._points(points)
+
+        index = points // self.block_shape
+        offset = points - index * self.block_shape
+
+        return index, offset
+
+    def locate_haloed(self, points):
+        """
+            Finds every haloed block containing each point.
+
+            Points near the edge of a block also fall in the halo of
+            neighboring blocks. So each point may appear several times in
+            the result, once for each haloed block containing it. Results
+            are sorted by point and then by block index.
+
+            Args:
+                points(numpy.ndarray):     an array of points with a row
+                                           for each point.
+
+            Returns:
+                (tuple(numpy.ndarray)):    the position of the point in
+                                           ``points``, the index of the
+                                           block in the grid, and the
+                                           offset in the haloed block.
+
+            Examples:
+
+                >>> grid = BlockGrid((12, 10), (4, 5), (1, 1))
+                >>> point, index, offset = grid.locate_haloed([[4, 1]])
+                >>> point.tolist()
+                [0, 0]
+                >>> index.tolist()
+                [[0, 0], [1, 0]]
+                >>> offset.tolist()
+                [[4, 1], [1, 1]]
+        """
+
+        points = self._points(points)
+
+        block_shape = numpy.array(self.block_shape, dtype=numpy.intp)
+        block_halo = numpy.array(self.block_halo, dtype=numpy.intp)
+        grid_shape = numpy.array(self.shape, dtype=numpy.intp)
+
+        # Range of blocks whose haloed extent includes each point.
+        first = -((block_halo + block_shape - 1 - points) // block_shape)
+        first = numpy.maximum(first, 0)
+        last = numpy.minimum(
+            (points + block_halo) // block_shape, grid_shape - 1
+        )
+
+        # Most blocks a point can be in along each dimension.
+        n_most = (2 * block_halo + block_shape - 1) // block_shape + 1
+
+        point_ids = []
+        indices = []
+        for each_shift in itertools.product(*[range(n) for n in n_most]):
+            each_index = first + numpy.array(each_shift, dtype=numpy.intp)
+            each_valid = (each_index <= last).all(axis=1)
+
+            point_ids.append(numpy.flatnonzero(each_valid))
+            indices.append(each_index[each_valid])
+
+        point_ids = numpy.concatenate(point_ids)
+        indices = numpy.concatenate(indices).reshape(-1, len(self.shape))
+
+        order = numpy.lexsort(list(indices.T[::-1]) + [point_ids])
+        point_ids = point_ids[order]
+        indices = indices[order]
+
+        haloed_start = numpy.maximum(indices * block_shape - block_halo, 0)
+        offset = points[point_ids] - haloed_start
+
+        return point_ids, indices, offset
+
+    def query(self, roi):
+        """
+            Finds the blocks overlapping a region of interest.
+
+            Computes the range of blocks the region overlaps along each
+            dimension. So only the blocks overlapping the region are
+            visited and the cost does not depend on the size of the grid.
+            Each is provided as an ``Overlap`` with the ``block``, the
+            ``space`` slicing of the overlap in the array, the ``local``
+            slicing of the overlap in the haloed block, and the ``roi``
+            slicing of the overlap in the region. Axes of the region
+            given by an integer keep the integer in the ``space`` and
+            ``local`` slicings and are dropped from the ``roi`` slicing.
+            Axes of the region that step backwards (with a step of ``-1``)
+            get ``roi`` slicings that step backwards too. So
+            ``a[roi][overlap.roi]`` matches
+            ``a[block.haloed][overlap.local]``.
+
+            Args:
+                roi(tuple(slice)):         a contiguous region of the array
+
+            Returns:
+                generator(Overlap):        overlaps of each block with the
+                                           region in C order.
+
+            Examples:
+
+                >>> grid = BlockGrid((12, 10), (4, 5), (1, 1))
+                >>> for each_overlap in grid.query(
+                ...     (slice(3, 6), 7)
+                ... ):  #doctest: +NORMALIZE_WHITESPACE
+                ...     each_overlap.block.index, each_overlap[1:]
+                ((0, 1), ((slice(3, 4, 1), 7), (slice(3, 4, 1), 3),
+                          (slice(0, 1, 1),)))
+                ((1, 1), ((slice(4, 6, 1), 7), (slice(1, 3, 1), 3),
+                          (slice(1, 3, 1),)))
+        """
+
+        try:
+            irange = xrange
+        except NameError:
+            irange = range
+
+        roi = kenjutsu.format.reformat_slices(roi, self.space_shape)
+
+        bounds = []
+        flips = []
+        for each_roi, each_length in zip(roi, self.space_shape):
+            if isinstance(each_roi, numbers.Integral):
+                bounds.append((each_roi, each_roi + 1))
+                flips.append(False)
+                continue
+            elif isinstance(each_roi, slice):
+                each_fwd, each_flip = kenjutsu.operators.forward_slice(
+                    each_roi, each_length
+                )
+                each_len = kenjutsu.measure._len_reformatted_slice(each_fwd)
+                if each_fwd.step == 1 or each_len <= 1:
+                    bounds.append(
+                        (each_fwd.start, each_fwd.start + each_len)
+                    )
+                    flips.append(each_flip)
+                    continue
+
+            raise ValueError(
+                "Only contiguous regions of interest are supported."
+                " Instead got `%s`." % str(each_roi)
+            )
+
+        if any(each_start >= each_stop for each_start, each_stop in bounds):
+            return iter([])
+
+        ranges = []
+        for (each_start, each_stop), each_block in zip(
+                bounds, self.block_shape):
+            ranges.append(irange(
+                each_start // each_block, (each_stop - 1) // each_block + 1
+            ))
+
+        def _query():
+            for each_index in itertools.product(*ranges):
+                each_block = self._block(each_index)
+
+                space = []
+                local = []
+                roi_local = []
+                for each_roi, (each_start, each_stop), each_flip, \
+                        each_core, each_haloed in zip(roi, bounds, flips,
+                                                      each_block.core,
+                                                      each_block.haloed):
+                    lo = max(each_start, each_core.start)
+                    hi = min(each_stop, each_core.stop)
+
+                    if isinstance(each_roi, numbers.Integral):
+                        space.append(lo)
+                        local.append(lo - each_haloed.start)
+                    else:
+                        space.append(slice(lo, hi, 1))
+                        local.append(slice(
+                            lo - each_haloed.start, hi - each_haloed.start, 1
+                        ))
+                        if each_flip:
+                            last = each_stop - 1
+                            roi_local.append(slice(
+                                last - lo,
+                                last - hi if last >= hi else None,
+                                -1
+                            ))
+                        else:
+                            roi_local.append(slice(
+                                lo - each_start, hi - each_start, 1
+                            ))
+
+                yield BlockGrid.Overlap(
+                    each_block, tuple(space), tuple(local), tuple(roi_local)
+                )
+
+        return _query()
+
+    def _curve_levels(self):
+        """
+            Provides the levels of the curve and the padded grid it covers.
+
+            Returns the number of bits of a position taken at each level,
+            the number of levels, and the shape of the padded grid. Each
+            level splits the parts of the curve above it into
+            ``2 ** width`` parts.
+        """
+
+        bits = tuple((n - 1).bit_length() for n in self.shape)
+        if self.order == "morton":
+            return 1, sum(bits), tuple(1 << e for e in bits)
+        else:
+            max_bits = max(bits) if bits else 0
+            return len(bits), max_bits, len(bits) * (1 << max_bits,)
+
+    def _curve_children(self, code, depth, lo, size):
+        """
+            Generates the parts of the curve below a part in curve order.
+
+            The part holds the positions whose first ``depth`` levels give
+            ``code``. It covers the box of block indices starting at ``lo``
+            with ``size`` along each dimension. Each part below it is given
+            with its code and box. Only parts holding blocks in the grid
+            are given.
+        """
+
+        width, levels, shape = self._curve_levels()
+        remaining = levels - depth - 1
+
+        if self.order == "morton":
+            # The bit taken splits the largest dimension left in two.
+            split_dim = max(range(len(size)), key=lambda d: (size[d], -d))
+            each_size = list(size)
+            each_size[split_dim] >>= 1
+            each_size = tuple(each_size)
+
+        for each_child in range(1 << width):
+            each_code = (code << width) | each_child
+
+            if self.order == "morton":
+                each_lo = list(lo)
+                each_lo[split_dim] += each_child * each_size[split_dim]
+            else:
+                # The part is an aligned cube holding its first position.
+                each_lo = _hilbert_decode(
+                    each_code << (width * remaining), levels, width
+                )
+                each_lo = [(i >> remaining) << remaining for i in each_lo]
+                each_size = width * (1 << remaining,)
+
+            if all(i < n for i, n in zip(each_lo, self.shape)):
+                yield each_code, tuple(each_lo), each_size
+
+    def _icurve(self):
+        """
+            Generates the block indices along the curve of the grid.
+        """
+
+        width, levels, shape = self._curve_levels()
+
+        stack = [(0, 0, len(self.shape) * (0,), shape)]
+        while stack:
+            code, depth, lo, size = stack.pop()
+            if depth == levels:
+                yield lo
+                continue
+
+            children = list(self._curve_children(code, depth, lo, size))
+            for each_code, each_lo, each_size in reversed(children):
+                stack.append((each_code, depth + 1, each_lo, each_size))
+
+    def _curve_unravel(self, flat_index):
+        """
+            Finds the block index at a position along the curve of the grid.
+
+            Counts the blocks of the grid in each part of the curve to find
+            the part holding the position. Then does the same within that
+            part until reaching the block. So no other positions are kept.
+        """
+
+        width, levels, size = self._curve_levels()
+
+        code = 0
+        lo = len(self.shape) * (0,)
+        for depth in range(levels):
+            children = self._curve_children(code, depth, lo, size)
+            for code, lo, size in children:
+                count = functools.reduce(operator.mul, (
+                    min(i + z, n) - i
+                    for i, z, n in zip(lo, size, self.shape)
+                ), 1)
+                if flat_index < count:
+                    break
+                flat_index -= count
+
+        return lo
+
+    def _unravel(self, flat_index):
+        """
+            Converts a position in the grid into a block index.
+        """
+
+        if self.order not in ("C", "F"):
+            return self._curve_unravel(flat_index)
+
+        shape = self.shape
+        if self.order == "F":
+            shape = shape[::-1]
+
+        index = []
+        for each_n in reversed(shape):
+            flat_index, each_i = divmod(flat_index, each_n)
+            index.append(each_i)
+
+        if self.order == "C":
+            index.reverse()
+
+        return tuple(index)
+
+    def _block(self, index):
+        """
+            Computes the slicings for the block at a given block index.
+        """
+
+        core = []
+        haloed = []
+        trimmed = []
+        for each_dim, each_i in enumerate(index):
+            each_core, each_haloed, each_trimmed = _block_slices(
+                self.space_shape[each_dim],
+                self.block_shape[each_dim],
+                self.block_halo[each_dim],
+                each_i
+            )
+
+            core.append(each_core)
+            haloed.append(each_haloed)
+            trimmed.append(each_trimmed)
+
+        return BlockGrid.Block(
+            index, tuple(core), tuple(haloed), tuple(trimmed)
+        )
+
+
+def split_blocks(space_shape, block_shape, block_halo=None, index=None,
+                 order="C"):
     """
         Return a list of slicings to cut each block out of an array or other.
 
@@ -117,12 +837,18 @@ def split_blocks(space_shape, block_shape, block_halo=None, index=None):
             be truncated to the largest block that will fit. This will raise
             a warning, which can be converted to an exception, if needed.
 
+        Note:
+            For large numbers of blocks, consider using ``BlockGrid``
+            instead, which computes the slicings of each block lazily.
+
         Args:
             space_shape(tuple):            Shape of array to slice
             block_shape(tuple):            Size of each block to take
             block_halo(tuple):             Halo to tack on to each block
             index(bool):                   Whether to provide an index for
                                            each block
+            order(str):                    Order to provide the blocks in
+                                           (see ``BlockGrid``)
 
         Returns:
             collections.Sequence of \
@@ -164,16 +890,6 @@ def split_blocks(space_shape, block_shape, block_halo=None, index=None):
 
     """
 
-    try:
-        irange = xrange
-    except NameError:
-        irange = range
-
-    try:
-        from itertools import ifilter, imap
-    except ImportError:
-        ifilter, imap = filter, map
-
     if index is None:
         index = False
         warnings.warn(
@@ -187,142 +903,229 @@ def split_blocks(space_shape, block_shape, block_halo=None, index=None):
             PendingDeprecationWarning
         )
 
-    if block_halo is not None:
-        if not (len(space_shape) == len(block_shape) == len(block_halo)):
-            raise ValueError(
-                "The dimensions of `space_shape`, `block_shape`, and"
-                " `block_halo` should be the same."
+    try:
+        irange = xrange
+    except NameError:
+        irange = range
+
+    grid = BlockGrid(space_shape, block_shape, block_halo, order)
+
+    # Compute the slices along each dimension once.
+    ranges_per_dim = []
+    haloed_ranges_per_dim = []
+    trimmed_halos_per_dim = []
+    for each_dim, each_n in enumerate(grid.shape):
+        a_range, a_range_haloed, a_trimmed_halo = zip(*[
+            _block_slices(
+                grid.space_shape[each_dim],
+                grid.block_shape[each_dim],
+                grid.block_halo[each_dim],
+                i
             )
+            for i in irange(each_n)
+        ])
+
+        ranges_per_dim.append(a_range)
+        haloed_ranges_per_dim.append(a_range_haloed)
+        trimmed_halos_per_dim.append(a_trimmed_halo)
+
+    # Take all combinations of all ranges to get blocks.
+    if grid.order == "C":
+        index_blocks = list(itertools.product(*[
+            irange(e) for e in grid.shape
+        ]))
+        orig_blocks = list(itertools.product(*ranges_per_dim))
+        haloed_blocks = list(itertools.product(*haloed_ranges_per_dim))
+        trimmed_halos = list(itertools.product(*trimmed_halos_per_dim))
     else:
-        if not (len(space_shape) == len(block_shape)):
-            raise ValueError(
-               "The dimensions of `space_shape` and `block_shape` should be"
-               " the same."
-            )
+        if grid.order == "F":
+            index_blocks = [
+                e[::-1] for e in itertools.product(*[
+                    irange(e) for e in reversed(grid.shape)
+                ])
+            ]
+        else:
+            index_blocks = list(grid._icurve())
+
+        orig_blocks = []
+        haloed_blocks = []
+        trimmed_halos = []
+        for each_index in index_blocks:
+            orig_blocks.append(tuple(
+                e[i] for e, i in zip(ranges_per_dim, each_index)
+            ))
+            haloed_blocks.append(tuple(
+                e[i] for e, i in zip(haloed_ranges_per_dim, each_index)
+            ))
+            trimmed_halos.append(tuple(
+                e[i] for e, i in zip(trimmed_halos_per_dim, each_index)
+            ))
 
-        block_halo = tuple()
-        for i in irange(len(space_shape)):
-            block_halo += (0,)
+    result = tuple()
+    if index:
+        result += (index_blocks,)
 
-    if not all(imap(lambda e: e > 0, space_shape)):
-        raise ValueError(
-            "Shape of the space must all be positive definite."
-            "Instead got: %s." % str(space_shape)
-        )
+    result += (orig_blocks, haloed_blocks, trimmed_halos)
 
-    if not all(imap(lambda e: e > 0 or e == -1, block_shape)):
-        raise ValueError(
-            "Shape of the blocks must all be positive or -1."
-            "Instead got: %s." % str(block_shape)
-        )
+    return result
 
-    if not all(imap(lambda e: e >= 0, block_halo)):
-        raise ValueError(
-            "Shape of the halo must all be positive semidefinite."
-            "Instead got: %s." % str(block_halo)
-        )
 
-    vec_add = lambda a, b: imap(operator.add, a, b)
-    vec_sub = lambda a, b: imap(operator.sub, a, b)
+def _split_chunks_dim(index, space_len, chunk_len):
+    """
+        Splits an index along one dimension by the chunks it touches.
 
-    vec_mul = lambda a, b: imap(operator.mul, a, b)
-    vec_mod = lambda a, b: imap(operator.mod, a, b)
+        Args:
+            index(slice):                  A reformatted index to split
+            space_len(int):                Length of the dimension
+            chunk_len(int):                Length of each chunk
 
-    vec_nonzero = lambda a: \
-            imap(lambda _: _[0], ifilter(lambda _: _[1], enumerate(a)))
-    vec_str = lambda a: imap(str, a)
+        Returns:
+            list(tuple):                   The chunk index, chunk-local
+                                           index, and output index for
+                                           each chunk touched (in order).
+    """
 
-    vec_clip_floor = lambda a, a_min: \
-            imap(lambda _: _ if _ >= a_min else a_min, a)
-    vec_clip_ceil = lambda a, a_max: \
-            imap(lambda _: _ if _ <= a_max else a_max, a)
-    vec_clip = lambda a, a_min, a_max: \
-            vec_clip_ceil(vec_clip_floor(a, a_min), a_max)
+    if isinstance(index, numbers.Integral):
+        i = index // chunk_len
+        return [(i, index - i * chunk_len, None)]
+    elif not isinstance(index, slice):
+        if not isinstance(index, list):
+            index = index.tolist()
+
+        # Group the indices by chunk keeping track of where they came from.
+        chunks = collections.OrderedDict()
+        for each_pos, each_index in enumerate(index):
+            i = each_index // chunk_len
+            each_chunk = chunks.setdefault(i, ([], []))
+            each_chunk[0].append(each_index - i * chunk_len)
+            each_chunk[1].append(each_pos)
+
+        result = []
+        for i in sorted(chunks):
+            each_local, each_out = chunks[i]
+            if (each_out[-1] - each_out[0]) == (len(each_out) - 1):
+                each_out = slice(each_out[0], each_out[-1] + 1, 1)
+            result.append((i, each_local, each_out))
+
+        return result
+
+    start, step = index.start, index.step
+    count = kenjutsu.measure._len_reformatted_slice(index)
+    if count == 0:
+        return []
+
+    last = start + (count - 1) * step
+    chunk_indices = range(start // chunk_len, last // chunk_len + 1)
+    if step < 0:
+        chunk_indices = range(start // chunk_len, last // chunk_len - 1, -1)
+
+    result = []
+    for i in chunk_indices:
+        each_core = _block_slices(space_len, chunk_len, 0, i)[0]
+
+        # Find the positions of the index that fall in this chunk.
+        if step > 0:
+            k0 = -((start - each_core.start) // step)
+            k1 = -((start - each_core.stop) // step)
+        else:
+            k0 = (start - each_core.stop) // -step + 1
+            k1 = (start - each_core.start) // -step + 1
+        k0 = max(k0, 0)
+        k1 = min(k1, count)
+        if k0 >= k1:
+            continue
+
+        local_start = start + k0 * step - each_core.start
+        local_stop = local_start + (k1 - k0) * step
+        if local_stop < 0:
+            local_stop = None
+
+        result.append((
+            i,
+            slice(local_start, local_stop, step),
+            slice(k0, k1, 1)
+        ))
 
-    uneven_block_division = tuple(vec_mod(space_shape, block_shape))
+    return result
 
-    if any(uneven_block_division):
-        uneven_block_division_str = vec_nonzero(uneven_block_division)
-        uneven_block_division_str = vec_str(uneven_block_division_str)
-        uneven_block_division_str = ", ".join(uneven_block_division_str)
 
-        warnings.warn(
-            "Blocks will not evenly divide the array." +
-            " The following dimensions will be unevenly divided: %s." %
-            uneven_block_division_str,
-            RuntimeWarning
-        )
+def split_chunks(slices, space_shape, chunk_shape):
+    """
+        Splits a selection into the parts that fall in each storage chunk.
 
-    ranges_per_dim = []
-    haloed_ranges_per_dim = []
-    trimmed_halos_per_dim = []
+        Takes a selection from an array with ``space_shape`` stored in
+        chunks of ``chunk_shape`` (as HDF5, Zarr, and others do). Finds
+        the chunks the selection touches and skips the rest. For each one,
+        provides the index of the chunk in the chunk grid, the slicing to
+        read from the chunk, and the slicing to write the result to in
+        the selection's output. This way each chunk only needs to be read
+        once.
 
-    for each_dim in irange(len(space_shape)):
-        # Construct each block using the block size given. Allow to spill over.
-        if block_shape[each_dim] == -1:
-            block_shape = (block_shape[:each_dim] +
-                           space_shape[each_dim:each_dim+1] +
-                           block_shape[each_dim+1:])
+        Note:
+            Integral indices drop their dimension from the output slicing
+            as the result of selecting does. Output slicings for sequences
+            of indices are slices when they are contiguous and lists of
+            positions otherwise. Sequences on several axes are outer
+            indexed (see ``reformat_slices``).
 
-        # Generate block ranges.
-        a_range = []
-        for i in irange(2):
-            offset = i * block_shape[each_dim]
-            this_range = irange(
-                offset,
-                offset + space_shape[each_dim],
-                block_shape[each_dim]
-            )
-            a_range.append(list(this_range))
+        Args:
+            slices(tuple(slice)):          Selection to split
+            space_shape(tuple):            Shape of array to select from
+            chunk_shape(tuple):            Size of each chunk
 
-        # Add the halo to each block on both sides.
-        a_range_haloed = []
-        for i in irange(2):
-            sign = 2 * i - 1
+        Returns:
+            list(tuple):                   The chunk index, chunk slicing,
+                                           and output slicing of each
+                                           chunk touched.
 
-            haloed = vec_mul(
-                itertools.repeat(sign, len(a_range[i])),
-                itertools.repeat(block_halo[each_dim], len(a_range[i])),
-            )
-            haloed = vec_add(a_range[i], haloed)
-            haloed = vec_clip(haloed, 0, space_shape[each_dim])
-
-            a_range_haloed.append(list(haloed))
-
-        # Compute how to trim the halo off of each block.
-        # Clip each block to the boundaries.
-        a_trimmed_halo = []
-        for i in irange(2):
-            trimmed = vec_sub(a_range[i], a_range_haloed[0])
-            a_trimmed_halo.append(list(trimmed))
-            a_range[i] = list(vec_clip(a_range[i], 0, space_shape[each_dim]))
-
-        # Convert all ranges to slices for easier use.
-        a_range = tuple(imap(slice, *a_range))
-        a_range_haloed = tuple(imap(slice, *a_range_haloed))
-        a_trimmed_halo = tuple(imap(slice, *a_trimmed_halo))
-
-        # Format all slices.
-        a_range = kenjutsu.format.reformat_slices(a_range)
-        a_range_haloed = kenjutsu.format.reformat_slices(a_range_haloed)
-        a_trimmed_halo = kenjutsu.format.reformat_slices(a_trimmed_halo)
-
-        # Collect all blocks
-        ranges_per_dim.append(a_range)
-        haloed_ranges_per_dim.append(a_range_haloed)
-        trimmed_halos_per_dim.append(a_trimmed_halo)
+        Examples:
 
-    # Take all combinations of all ranges to get blocks.
-    result = tuple()
-    if index:
-        index_blocks = imap(lambda e: irange(len(e)), ranges_per_dim)
-        index_blocks = list(itertools.product(*index_blocks))
-        result += (index_blocks,)
+            >>> split_chunks(
+            ...     (slice(1, 7), 4), (10, 8), (3, 3)
+            ... )  #doctest: +NORMALIZE_WHITESPACE
+            [((0, 1), (slice(1, 3, 1), 1), (slice(0, 2, 1),)),
+             ((1, 1), (slice(0, 3, 1), 1), (slice(2, 5, 1),)),
+             ((2, 1), (slice(0, 1, 1), 1), (slice(5, 6, 1),))]
 
-    orig_blocks = list(itertools.product(*ranges_per_dim))
-    haloed_blocks = list(itertools.product(*haloed_ranges_per_dim))
-    trimmed_halos = list(itertools.product(*trimmed_halos_per_dim))
+    """
 
-    result += (orig_blocks, haloed_blocks, trimmed_halos)
+    try:
+        from itertools import imap
+    except ImportError:
+        imap = map
+
+    if not (len(space_shape) == len(chunk_shape)):
+        raise ValueError(
+            "The dimensions of `space_shape` and `chunk_shape` should be"
+            " the same."
+        )
+
+    if not all(imap(lambda e: e > 0, space_shape)):
+        raise ValueError(
+            "Shape of the space must all be positive definite."
+            "Instead got: %s." % str(space_shape)
+        )
+
+    if not all(imap(lambda e: e > 0, chunk_shape)):
+        raise ValueError(
+            "Shape of the chunks must all be positive definite."
+            "Instead got: %s." % str(chunk_shape)
+        )
+
+    slices = kenjutsu.format.reformat_slices(slices, space_shape)
+
+    chunks_per_dim = []
+    for each_slice, each_space, each_chunk in zip(
+            slices, space_shape, chunk_shape):
+        chunks_per_dim.append(
+            _split_chunks_dim(each_slice, each_space, each_chunk)
+        )
+
+    result = []
+    for each_chunk in itertools.product(*chunks_per_dim):
+        chunk_index, chunk_slices, out_slices = zip(*each_chunk)
+        out_slices = tuple(e for e in out_slices if e is not None)
+
+        result.append((chunk_index, chunk_slices, out_slices))
 
     return result
@@ -0,0 +1,280 @@
+from __future__ import absolute_import
+
+__author__ = "John Kirkham <kirkhamj@janelia.hhmi.org>"
+__date__ = "$Oct 18, 2026 00:35:44 GMT+0000$"
+
+
+import collections
+import numbers
+import threading
+
+import kenjutsu.format
+import kenjutsu.measure
+
+try:
+    import collections.abc as collections_abc
+except ImportError:
+    import collections as collections_abc
+
+
+class _Tag(object):
+    """
+        Marks the kind of value in a canonical key.
+    """
+
+    __slots__ = ["name"]
+
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return "<%s>" % self.name
+
+
+_SLICE = _Tag("slice")
+_RANGE = _Tag("range")
+_SEQUENCE = _Tag("sequence")
+
+# Types that are kept as is in a key.
+_PLAIN = frozenset([int, type(None)])
+
+
+def _canonical(value):
+    """
+        Converts slices, indices, and lengths into a hashable form.
+
+        Args:
+            value(object):               a value to convert
+
+        Returns:
+            (object):                    a hashable form of the value
+    """
+
+    try:
+        irange = xrange
+    except NameError:
+        irange = range
+
+    if value is None or value is Ellipsis:
+        return value
+    elif isinstance(value, bool):
+        return (bool, value)
+    elif isinstance(value, numbers.Integral):
+        return int(value)
+    elif isinstance(value, slice):
+        return (
+            _SLICE,
+            _canonical(value.start),
+            _canonical(value.stop),
+            _canonical(value.step)
+        )
+    elif isinstance(value, irange):
+        n = len(value)
+        return (_RANGE, tuple(value[i] for i in irange(min(n, 2))), n)
+    elif isinstance(value, collections_abc.Sequence):
+        return (_SEQUENCE, type(value), tuple(map(_canonical, value)))
+    else:
+        return (type(value), value)
+
+
+def _key(func, slices, lengths):
+    """
+        Makes a flat hashable key for a call with slices and lengths.
+
+        Plain slices and integers are laid out flat with a marker before
+        each. So the common case does not build nested keys. Anything else
+        falls back to ``_canonical``.
+
+        Args:
+            func(callable):              the function called
+            slices(tuple(slice)):        the slices given
+            lengths(tuple(int)):         the lengths given
+
+        Returns:
+            (tuple):                     a key for the call
+    """
+
+    key = [func, type(slices)]
+
+    if type(slices) is not tuple:
+        slices = (slices,)
+
+    for each_slice in slices:
+        each_type = type(each_slice)
+        if each_type is slice:
+            start = each_slice.start
+            stop = each_slice.stop
+            step = each_slice.step
+            if (type(start) in _PLAIN and
+                    type(stop) in _PLAIN and
+                    type(step) in _PLAIN):
+                key.extend((_SLICE, start, stop, step))
+                continue
+        elif each_type is int:
+            key.extend((int, each_slice))
+            continue
+
+        key.append(_canonical(each_slice))
+
+    if lengths is None or type(lengths) is int:
+        key.append(lengths)
+    elif type(lengths) is tuple and all(type(e) is int for e in lengths):
+        key.append(lengths)
+    else:
+        key.append(_canonical(lengths))
+
+    return tuple(key)
+
+
+class SliceCache(object):
+    """
+        A bounded cache of normalized slices and their lengths.
+
+        Keeps the results of ``reformat_slices`` and ``len_slices`` for
+        recently seen slices and lengths. When the same slices and lengths
+        come up again, the result is looked up instead of being computed.
+        Once ``maxsize`` results are kept, the least recently used result
+        is dropped to make room. Counts of ``hits``, ``misses``, and
+        ``evictions`` are kept to help with tuning ``maxsize``.
+
+        Note:
+            Results that raise an exception are not cached. Neither are
+            inputs that cannot be made hashable. These are simply computed.
+
+        Args:
+            maxsize(int):                  most results to keep (``None`` \
+                                           for no limit)
+
+        Examples:
+
+            >>> cache = SliceCache(maxsize=2)
+            >>> cache.reformat_slices((slice(None), 3), (10, 5))
+            (slice(0, 10, 1), 3)
+            >>> cache.len_slices((slice(None), 3), (10, 5))
+            (10,)
+            >>> cache.len_slices((slice(None), 3), (10, 5))
+            (10,)
+            >>> cache.hits, cache.misses, cache.evictions
+            (1, 2, 0)
+            >>> cache.reformat_slices(slice(2, None), 10)
+            (slice(2, 10, 1),)
+            >>> cache.hits, cache.misses, cache.evictions
+            (1, 3, 1)
+            >>> cache.clear()
+            >>> len(cache)
+            0
+
+    """
+
+    def __init__(self, maxsize=128):
+        if maxsize is not None and maxsize < 0:
+            raise ValueError(
+                "The `maxsize` must be positive semidefinite or `None`."
+                " Instead got: %s." % str(maxsize)
+            )
+
+        self.maxsize = maxsize
+
+        self._lock = threading.Lock()
+        self._results = collections.OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._results)
+
+    def __repr__(self):
+        return "%s(maxsize=%s)" % (type(self).__name__, str(self.maxsize))
+
+    def clear(self):
+        """
+            Drops all cached results and resets all counts.
+        """
+
+        with self._lock:
+            self._results.clear()
+
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def _lookup(self, func, slices, lengths):
+        """
+            Finds the result for the given function or computes it.
+        """
+
+        try:
+            key = _key(func, slices, lengths)
+            hash(key)
+        except TypeError:
+            return func(slices, lengths)
+
+        with self._lock:
+            try:
+                result, copy = self._results.pop(key)
+            except KeyError:
+                pass
+            else:
+                self._results[key] = (result, copy)
+                self.hits += 1
+
+                # Copy any sequences so the cached result cannot be changed.
+                if copy:
+                    result = tuple(
+                        list(e) if isinstance(e, list) else e for e in result
+                    )
+
+                return result
+
+        result = func(slices, lengths)
+        copy = any(isinstance(e, list) for e in result)
+
+        with self._lock:
+            self.misses += 1
+            if self.maxsize != 0:
+                self._results[key] = (result, copy)
+            if self.maxsize is not None:
+                while len(self._results) > self.maxsize:
+                    self._results.popitem(last=False)
+                    self.evictions += 1
+
+        if copy:
+            result = tuple(
+                list(e) if isinstance(e, list) else e for e in result
+            )
+
+        return result
+
+    def reformat_slices(self, slices, lengths=None):
+        """
+            Cached form of ``kenjutsu.format.reformat_slices``.
+
+            Args:
+                slices(tuple(slice)):        a tuple of slices to reformat.
+                lengths(tuple(int)):         a tuple of lengths to fill.
+
+            Returns:
+                (slice):                     a tuple of slices with all
+                                             default values filled if
+                                             possible.
+        """
+
+        return self._lookup(
+            kenjutsu.format.reformat_slices, slices, lengths
+        )
+
+    def len_slices(self, slices, lengths=None):
+        """
+            Cached form of ``kenjutsu.measure.len_slices``.
+
+            Args:
+                slices(tuple(slice)):        a tuple of slices to measure.
+                lengths(tuple(int)):         a tuple of lengths to fill.
+
+            Returns:
+                (tuple(int)):                the length of each slice.
+        """
+
+        return self._lookup(kenjutsu.measure.len_slices, slices, lengths)
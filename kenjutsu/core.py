@@ -25,16 +25,217 @@ __author__ = "John Kirkham <kirkhamj@janelia.hhmi.org>"
 __date__ = "$Dec 08, 2016 11:35:58 GMT-0500$"
 
 
+import functools
+import numbers
+import operator
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 import kenjutsu.blocks
+import kenjutsu.cache
 import kenjutsu.format
 import kenjutsu.measure
+import kenjutsu.operators
+import kenjutsu.parallel
+import kenjutsu.plan
+import kenjutsu.reader
 
 
 reformat_slice = kenjutsu.format.reformat_slice
 reformat_slices = kenjutsu.format.reformat_slices
+unique_indices = kenjutsu.format.unique_indices
 
 UnknownSliceLengthException = kenjutsu.measure.UnknownSliceLengthException
 len_slice = kenjutsu.measure.len_slice
 len_slices = kenjutsu.measure.len_slices
+selection_shape = kenjutsu.measure.selection_shape
+selection_nbytes = kenjutsu.measure.selection_nbytes
+contiguous_runs = kenjutsu.measure.contiguous_runs
+num_contiguous_runs = kenjutsu.measure.num_contiguous_runs
+
+SliceCache = kenjutsu.cache.SliceCache
 
+compose = kenjutsu.operators.compose
+compose_slices = kenjutsu.operators.compose_slices
+intersect = kenjutsu.operators.intersect
+intersect_slices = kenjutsu.operators.intersect_slices
+cover = kenjutsu.operators.cover
+cover_slices = kenjutsu.operators.cover_slices
+forward_slice = kenjutsu.operators.forward_slice
+forward_slices = kenjutsu.operators.forward_slices
+
+BlockGrid = kenjutsu.blocks.BlockGrid
 split_blocks = kenjutsu.blocks.split_blocks
+split_chunks = kenjutsu.blocks.split_chunks
+
+map_blocks = kenjutsu.parallel.map_blocks
+SharedArray = kenjutsu.parallel.SharedArray
+
+plan_reads = kenjutsu.plan.plan_reads
+
+read_raw = kenjutsu.reader.read_raw
+read_npy = kenjutsu.reader.read_npy
+
+
+class Selection(tuple):
+    """
+        A normalized selection from an array with its result shape and size.
+
+        Normalizes the slices against the shape given once using
+        ``reformat_slices``. The shape of the result, number of elements,
+        and bounding box are computed at the same time. So these can be
+        passed along and used without normalizing again. As it is a
+        ``tuple`` of the normalized slices, it can be used directly as a
+        key for a NumPy array, HDF5 dataset, or other. Unlike a ``tuple``
+        of slices, it is also hashable.
+
+        Note:
+            Sequences are outer indexed (see ``reformat_slices``). So
+            ``shape`` is the shape of the outer indexed result. NumPy
+            indexes a sequence mixed with other sequences or integral
+            indices differently. Use ``ix`` as the key for a NumPy array
+            to get a result with ``shape``.
+
+        Args:
+            slices(tuple(slice)):        a tuple of slices to select with.
+            shape(tuple(int)):           shape of the array to select from.
+
+        Examples:
+
+            >>> sel = Selection((slice(None, None, 2), 3, [4, 0]), (10, 5, 6))
+            >>> sel
+            Selection((slice(0, 10, 2), 3, [4, 0]), (10, 5, 6))
+            >>> sel.shape
+            (5, 2)
+            >>> sel.size
+            10
+            >>> sel.bbox
+            (slice(0, 9, 1), slice(3, 4, 1), slice(0, 5, 1))
+            >>> other = Selection((3, slice(None), [4, 0]), (10, 5, 6))
+            >>> other.shape
+            (5, 2)
+            >>> numpy.zeros((10, 5, 6))[other.ix].shape
+            (5, 2)
+            >>> sel == Selection((slice(0, 10, 2), -2, [-2, 0]), (10, 5, 6))
+            True
+            >>> list(range(10)[Selection(slice(2, None, 3), (10,))[0]])
+            [2, 5, 8]
+    """
+
+    def __new__(cls, slices, shape):
+        shape = tuple(shape)
+
+        new_slices = kenjutsu.format.reformat_slices(slices, shape)
+
+        self = super(Selection, cls).__new__(cls, new_slices)
+
+        self.space_shape = shape
+
+        result_shape = []
+        bbox = []
+        key = []
+        for each_slice in new_slices:
+            if isinstance(each_slice, numbers.Integral):
+                bbox.append(slice(each_slice, each_slice + 1, 1))
+                key.append(each_slice)
+                continue
+
+            each_len = kenjutsu.measure._len_reformatted_slice(each_slice)
+            result_shape.append(each_len)
+
+            if isinstance(each_slice, slice):
+                key.append(
+                    (slice, each_slice.start, each_slice.stop, each_slice.step)
+                )
+                first = each_slice.start
+                last = first + (each_len - 1) * each_slice.step
+            else:
+                # Convert NumPy arrays for hashing.
+                if not isinstance(each_slice, list):
+                    each_slice = each_slice.tolist()
+
+                key.append((list, tuple(each_slice)))
+                if each_len:
+                    first = min(each_slice)
+                    last = max(each_slice)
+
+            if each_len:
+                bbox.append(slice(min(first, last), max(first, last) + 1, 1))
+            else:
+                bbox.append(slice(0, 0, 1))
+
+        self.shape = tuple(result_shape)
+        self.size = functools.reduce(operator.mul, self.shape, 1)
+        self.bbox = tuple(bbox)
+
+        self._key = tuple(key)
+        self._hash = hash(self._key)
+
+        return self
+
+    def __getnewargs__(self):
+        return (tuple(self), self.space_shape)
+
+    @property
+    def ix(self):
+        """
+            A key that outer indexes a NumPy array.
+
+            Without sequences, this is just the normalized slices. Otherwise
+            each axis that is kept is selected with an array shaped to span
+            only that axis (like ``numpy.ix_``). So the result of indexing
+            a NumPy array with it always has ``shape``.
+
+            Returns:
+                (tuple):                 a key for indexing a NumPy array.
+        """
+
+        if all(isinstance(e, (numbers.Integral, slice)) for e in self):
+            return tuple(self)
+
+        key = []
+        i = 0
+        for each_slice, each_length in zip(self, self.space_shape):
+            if isinstance(each_slice, numbers.Integral):
+                key.append(each_slice)
+                continue
+
+            if isinstance(each_slice, slice):
+                each_slice = numpy.arange(each_length)[each_slice]
+
+            each_shape = len(self.shape) * [1]
+            each_shape[i] = -1
+            key.append(
+                numpy.asarray(each_slice, dtype=numpy.intp).reshape(each_shape)
+            )
+            i += 1
+
+        return tuple(key)
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        if isinstance(other, Selection):
+            return (
+                self.space_shape == other.space_shape and
+                self._key == other._key
+            )
+        else:
+            return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is not NotImplemented:
+            result = not result
+        return result
+
+    def __repr__(self):
+        return "%s(%s, %s)" % (
+            type(self).__name__,
+            repr(tuple(self)),
+            repr(self.space_shape)
+        )
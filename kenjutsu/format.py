@@ -2,10 +2,49 @@ __author__ = "John Kirkham <kirkhamj@janelia.hhmi.org>"
 __date__ = "$Dec 08, 2016 14:20:52 GMT-0500$"
 
 
-import collections
 import itertools
 import numbers
 
+try:
+    import collections.abc as collections_abc
+except ImportError:
+    import collections as collections_abc
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def is_index_sequence(index):
+    """
+        Determines whether an index is a sequence of integral indices.
+
+        Both Python sequences (e.g. ``list``\\ s) and 1-D NumPy arrays are
+        treated as sequences of indices.
+
+        Args:
+            index(object):               an index to check
+
+        Returns:
+            (bool):                      whether it is a sequence of indices
+
+        Examples:
+
+            >>> is_index_sequence([0, 2])
+            True
+
+            >>> is_index_sequence(slice(0, 2))
+            False
+    """
+
+    if isinstance(index, collections_abc.Sequence):
+        return True
+    elif numpy is not None and isinstance(index, numpy.ndarray):
+        return True
+    else:
+        return False
+
 
 def index_to_slice(index):
     """
@@ -44,6 +83,183 @@ def index_to_slice(index):
     return slice(index, index + step, step)
 
 
+class NormalizedSlice(object):
+    """
+        A slice that is known to already be normalized.
+
+        Normalizes the slice given once using ``reformat_slice``. As the
+        result is marked as normalized, functions in ``kenjutsu`` use it as
+        is instead of normalizing it again. Its length is computed once
+        when first needed and then kept. Unlike a ``slice``, it is also
+        hashable. So it can be used as a key in a ``dict`` or other.
+
+        Note:
+            The slice given and the length it was normalized against are
+            kept. If it is used with a different length, the slice given is
+            normalized against that length instead. Functions that reformat
+            slices give back a plain ``slice`` in either case.
+
+        Note:
+            Equality with a ``slice`` holds if the normalized values match.
+            Use ``as_slice`` to get a ``slice`` for indexing an array.
+
+        Args:
+            a_slice(slice):        a slice to normalize.
+
+            a_length(int):         a length to normalize against.
+
+        Examples:
+
+            >>> a_slice = NormalizedSlice(slice(None, None, -2), 10)
+            >>> a_slice
+            NormalizedSlice(9, None, -2)
+            >>> len(a_slice)
+            5
+            >>> a_slice == slice(9, None, -2)
+            True
+            >>> reformat_slice(a_slice, 10)
+            slice(9, None, -2)
+            >>> list(range(10)[a_slice.as_slice()])
+            [9, 7, 5, 3, 1]
+    """
+
+    __slots__ = ["start", "stop", "step", "_a_slice", "_a_length", "_length"]
+
+    def __init__(self, a_slice, a_length=None):
+        if isinstance(a_slice, NormalizedSlice):
+            if a_length is None:
+                a_length = a_slice._a_length
+            a_slice = a_slice._a_slice
+        elif not isinstance(a_slice, slice):
+            raise TypeError(
+                "Expected a slice. Instead got `%s`." % str(a_slice)
+            )
+
+        new_slice = reformat_slice(a_slice, a_length)
+
+        self.start = new_slice.start
+        self.stop = new_slice.stop
+        self.step = new_slice.step
+        self._a_slice = a_slice
+        self._a_length = a_length
+        self._length = None
+
+    def __len__(self):
+        if self._length is None:
+            import kenjutsu.measure
+
+            self._length = kenjutsu.measure._len_reformatted_slice(
+                self.as_slice()
+            )
+
+        return self._length
+
+    def __hash__(self):
+        return hash((self.start, self.stop, self.step))
+
+    def __eq__(self, other):
+        if isinstance(other, (slice, NormalizedSlice)):
+            return (
+                (self.start, self.stop, self.step) ==
+                (other.start, other.stop, other.step)
+            )
+        else:
+            return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is not NotImplemented:
+            result = not result
+        return result
+
+    def __repr__(self):
+        return "%s(%s, %s, %s)" % (
+            type(self).__name__,
+            repr(self.start),
+            repr(self.stop),
+            repr(self.step)
+        )
+
+    def as_slice(self):
+        """
+            Provides the normalized values as a ``slice``.
+
+            Returns:
+                (slice):           a slice with the normalized values.
+        """
+
+        return slice(self.start, self.stop, self.step)
+
+
+def range_to_slice(a_range, a_length=None):
+    """
+        Converts a range of indices into an equivalent slice.
+
+        Only the ends and step of the range are used. So this takes the
+        same time regardless of how many indices are in the range. The
+        indices are bounds checked against ``a_length`` if it is provided.
+
+        Note:
+            A range that has both negative and non-negative indices refers
+            to indices at both ends of a dimension. Unless ``a_length`` is
+            provided to resolve these, such a range cannot be expressed as
+            a slice. So it is normalized as a sequence of indices instead.
+
+        Args:
+            a_range(range):        a range of indices to convert.
+
+            a_length(int):         a length to normalize against.
+
+        Returns:
+            (slice):               a normalized slice with the same indices
+                                   (or a list of indices if needed).
+
+        Examples:
+
+            >>> range_to_slice(range(2, 8, 2))
+            slice(2, 8, 2)
+
+            >>> range_to_slice(range(-3, 0))
+            slice(-3, None, 1)
+
+            >>> range_to_slice(range(-1, -10, -4), 10)
+            slice(9, None, -4)
+
+            >>> range_to_slice(range(-2, 2))
+            [-2, -1, 0, 1]
+    """
+
+    n = len(a_range)
+    if n == 0:
+        return slice(0, 0, 1)
+
+    first = a_range[0]
+    last = a_range[-1]
+    step = a_range[1] - first if n > 1 else 1
+
+    if a_length is not None:
+        if not ((-a_length <= first < a_length) and
+                (-a_length <= last < a_length)):
+            raise IndexError("Index out of range.")
+
+        if first < 0:
+            first += a_length
+        if last < 0:
+            last += a_length
+
+        if n > 1 and (last - first) != (n - 1) * step:
+            # Wraps around the end, so handle as two ranges.
+            return reformat_slice(list(a_range), a_length)
+    elif (first < 0) != (last < 0):
+        return reformat_slice(list(a_range), a_length)
+
+    stop = last + step
+    if (stop < 0) != (last < 0):
+        stop = None
+
+    return reformat_slice(slice(first, stop, step), a_length)
+
+
 def reformat_slice(a_slice, a_length=None):
     """
         Takes a slice and reformats it to fill in as many undefined values as
@@ -66,14 +282,47 @@ def reformat_slice(a_slice, a_length=None):
 
             >>> reformat_slice(slice(2, -1, None), 10)
             slice(2, 9, 1)
+
+            >>> reformat_slice(range(0, 10**8, 3), 10**8)
+            slice(0, 100000000, 3)
     """
 
+    try:
+        irange = xrange
+    except NameError:
+        irange = range
+
+    if isinstance(a_slice, NormalizedSlice):
+        if a_length is None or a_length == a_slice._a_length:
+            return a_slice.as_slice()
+
+        a_slice = a_slice._a_slice
+
     new_slice = a_slice
-    if (new_slice is Ellipsis) or (new_slice == tuple()):
+    if isinstance(a_slice, irange):
+        return range_to_slice(a_slice, a_length)
+    elif (new_slice is Ellipsis) or (isinstance(new_slice, tuple) and
+                                     new_slice == tuple()):
         new_slice = slice(None)
     elif isinstance(a_slice, numbers.Integral):
         new_slice = index_to_slice(a_slice)
-    elif isinstance(a_slice, collections.Sequence):
+    elif numpy is not None and isinstance(a_slice, numpy.ndarray):
+        if (a_slice.ndim != 1 or
+                (a_slice.size and
+                 not issubclass(a_slice.dtype.type, numpy.integer))):
+            raise TypeError(
+                "Arbitrary sequences not permitted."
+                " All elements must be of integral type."
+            )
+
+        # Normalize all integers in the array at once.
+        new_slice = a_slice.astype(numpy.intp)
+        if a_length is not None:
+            if ((new_slice < -a_length) | (new_slice >= a_length)).any():
+                raise IndexError("Index out of range.")
+            new_slice[new_slice < 0] += a_length
+        return new_slice
+    elif isinstance(a_slice, collections_abc.Sequence):
         if not all(map(lambda i: isinstance(i, numbers.Integral), a_slice)):
             raise TypeError(
                 "Arbitrary sequences not permitted."
@@ -178,6 +427,13 @@ def reformat_slices(slices, lengths=None):
         Takes a tuple of slices and reformats them to fill in as many undefined
         values as possible.
 
+        Note:
+            Any number of axes may have a sequence of indices. These are
+            treated as outer indexing. In other words, each sequence selects
+            along its own axis independently of the others (like using
+            ``numpy.ix_``) instead of being zipped together as NumPy's
+            advanced indexing does.
+
         Args:
             slices(tuple(slice)):        a tuple of slices to reformat.
             lengths(tuple(int)):         a tuple of lengths to fill.
@@ -198,12 +454,18 @@ def reformat_slices(slices, lengths=None):
             ...     (10, 13, 15, 20)
             ... )
             (slice(0, 10, 1), slice(3, 13, 1), slice(0, 5, 1), slice(0, 20, 2))
+
+            >>> reformat_slices(([2, -1], slice(None), [0, -2]), (4, 3, 5))
+            ([2, 3], slice(0, 3, 1), [0, 3])
     """
 
     new_slices = slices
-    if new_slices == tuple():
+    if isinstance(new_slices, tuple) and new_slices == tuple():
         new_slices = Ellipsis
 
+    if numpy is not None and isinstance(new_slices, numpy.ndarray):
+        new_slices = (new_slices,)
+
     try:
         len(new_slices)
     except TypeError:
@@ -217,15 +479,15 @@ def reformat_slices(slices, lengths=None):
         new_lengths = (new_lengths,)
 
     el_idx = None
-    try:
-        el_idx = new_slices.index(Ellipsis)
-    except ValueError:
-        pass
+    for i, each_slice in enumerate(new_slices):
+        if each_slice is Ellipsis:
+            el_idx = i
+            break
 
     if new_lengths is not None and el_idx is None:
         if len(new_slices) < len(new_lengths):
+            el_idx = len(new_slices)
             new_slices += (Ellipsis,)
-            el_idx = new_slices.index(Ellipsis)
         elif len(new_slices) > len(new_lengths):
             raise ValueError(
                 "Shape must be as large or larger than the number of slices."
@@ -252,7 +514,7 @@ def reformat_slices(slices, lengths=None):
         slices_before = new_slices[:el_idx]
         slices_after = new_slices[el_idx+1:]
 
-        if Ellipsis in slices_before or Ellipsis in slices_after:
+        if any(e is Ellipsis for e in slices_after):
             raise ValueError("Only one Ellipsis is permitted. Found multiple.")
 
         new_lengths_before = None
@@ -289,19 +551,434 @@ def reformat_slices(slices, lengths=None):
 
         new_slices = tuple(new_slices)
 
-    n_seqs = sum(map(
-        lambda i: isinstance(i, collections.Sequence), new_slices
-    ))
-    if n_seqs > 1:
-        raise ValueError(
-            "Only one integral sequence supported."
-            " Instead got `%s`." % str(n_seqs)
+    return(new_slices)
+
+
+def _split_none_array(a):
+    """
+        Splits an array into integral values and a mask of ``None``\\ s.
+
+        Accepts masked arrays, where masked values are treated as ``None``,
+        or arrays that contain ``None`` directly (e.g. of ``object`` type).
+
+        Args:
+            a(array-like):               values with ``None`` to split
+
+        Returns:
+            (tuple(numpy.ndarray)):      integral values and ``None`` mask
+    """
+
+    a_mask = numpy.ma.getmaskarray(a)
+    a = numpy.ma.getdata(a)
+    if a.dtype == object:
+        a_mask = a_mask | numpy.equal(a, None)
+        a = numpy.where(a_mask, 0, a)
+
+    a = a.astype(numpy.int64)
+
+    return a, a_mask
+
+
+def reformat_slice_arrays(starts, stops, steps, lengths=None):
+    """
+        Reformats many slices given as arrays of their values at once.
+
+        Provides the same result as calling ``reformat_slice`` with each
+        slice (and length) given. However, all of the slices are normalized
+        together using NumPy. So a large batch of slices can be normalized
+        with a single call. Each argument is broadcast against the others.
+        Values of ``None`` are given by masking them (e.g. using a
+        ``numpy.ma.MaskedArray``) or by including them in an ``object``
+        array.
+
+        Args:
+            starts(array-like):          starts of slices to reformat.
+            stops(array-like):           stops of slices to reformat.
+            steps(array-like):           steps of slices to reformat.
+            lengths(array-like):         lengths to fill if not provided.
+
+        Returns:
+            (tuple(numpy.ma.MaskedArray)):   reformatted starts, stops, and \
+                                             steps with ``None`` masked.
+
+        Examples:
+
+            >>> starts, stops, steps = reformat_slice_arrays(
+            ...     numpy.ma.masked_equal([2, -20, -20], -20),
+            ...     numpy.ma.masked_equal([-1, -20, -20], -20),
+            ...     numpy.ma.masked_equal([-20, -20, -1], -20),
+            ...     10
+            ... )
+            >>> starts.tolist(), stops.tolist(), steps.tolist()
+            ([2, 0, 9], [9, 10, None], [1, 1, -1])
+    """
+
+    starts, starts_m = _split_none_array(starts)
+    stops, stops_m = _split_none_array(stops)
+    steps, steps_m = _split_none_array(steps)
+
+    if lengths is None:
+        lengths = numpy.ma.masked_all((), dtype=numpy.int64)
+    lengths, lengths_m = _split_none_array(lengths)
+
+    (starts, starts_m, stops, stops_m, steps, steps_m, lengths, lengths_m) = \
+        numpy.broadcast_arrays(
+            starts, starts_m,
+            stops, stops_m,
+            steps, steps_m,
+            lengths, lengths_m
         )
 
-    return(new_slices)
+    if ((steps == 0) & ~steps_m).any():
+        raise ValueError("Slice cannot have a step size of `0`.")
+
+    has_length = ~lengths_m
+
+    # Fill unknown values.
+    step = numpy.where(steps_m, 1, steps)
+    start = numpy.where(starts_m, numpy.where(step > 0, 0, -1), starts)
+    stop_fill = stops_m & (step > 0) & has_length
+    stop = numpy.where(stop_fill, lengths, stops)
+    stop_none = stops_m & ~stop_fill
+    stop_i = ~stop_none
+
+    def _empty(mask, start, stop, step, stop_none):
+        return (
+            numpy.where(mask, 0, start),
+            numpy.where(mask, 0, stop),
+            numpy.where(mask, 1, step),
+            stop_none & ~mask
+        )
+
+    # Make adjustments for length
+    # Normalize out-of-bound step sizes.
+    step = numpy.where(has_length & (step < -lengths), -lengths, step)
+    step = numpy.where(has_length & (step > lengths), lengths, step)
+
+    # Normalize bounded negative values.
+    start = numpy.where(
+        has_length & (-lengths <= start) & (start < 0),
+        start + lengths,
+        start
+    )
+    stop = numpy.where(
+        has_length & stop_i & (-lengths <= stop) & (stop < 0),
+        stop + lengths,
+        stop
+    )
+
+    # Handle out-of-bound limits.
+    pos_step = has_length & (step > 0)
+    neg_step = has_length & (step < 0)
+
+    pos_empty = pos_step & ((start > lengths) | (stop < -lengths))
+    pos_clip = pos_step & ~pos_empty
+    neg_empty = neg_step & (
+        (start < -lengths) | (stop_i & (stop >= (lengths - 1)))
+    )
+    neg_clip = neg_step & ~neg_empty
+
+    start = numpy.where(pos_clip & (start < -lengths), 0, start)
+    stop = numpy.where(pos_clip & (stop > lengths), lengths, stop)
+
+    start = numpy.where(neg_clip & (start >= lengths), lengths - 1, start)
+    neg_stop_none = neg_clip & stop_i & (stop < -lengths)
+    stop_none = stop_none | neg_stop_none
+    stop_i = stop_i & ~neg_stop_none
+
+    start, stop, step, stop_none = _empty(
+        pos_empty | neg_empty, start, stop, step, stop_none
+    )
+
+    # Catch some known empty slices.
+    empty_1 = stop_i & (start == stop)
+    empty_2 = ~empty_1 & (step > 0) & ~stop_none & (stop == 0)
+    empty_3 = ~(empty_1 | empty_2) & (step < 0) & ~stop_none & (stop == -1)
+    empty_4 = ~(empty_1 | empty_2 | empty_3) & (
+        stop_i & (start >= 0) & (stop >= 0) & (
+            ((step > 0) & (start > stop)) | ((step < 0) & (start < stop))
+        )
+    )
 
+    start, stop, step, stop_none = _empty(
+        empty_1 | empty_2 | empty_3 | empty_4, start, stop, step, stop_none
+    )
 
-def split_indices(slices):
+    start = numpy.ma.masked_array(start, mask=numpy.zeros_like(stop_none))
+    stop = numpy.ma.masked_array(stop, mask=stop_none)
+    step = numpy.ma.masked_array(step, mask=numpy.zeros_like(stop_none))
+
+    return start, stop, step
+
+
+def coalesce_indices(indices):
+    """
+        Groups a sequence of indices into runs that can each be a slice.
+
+        Finds runs of consecutive indices that form an arithmetic
+        progression while keeping the original order. Each run is given
+        as a slice along with the number of indices it contains. Runs are
+        taken greedily, which gives the fewest slices possible.
+
+        Note:
+            Runs do not cross between non-negative and negative indices as
+            these refer to opposite ends of a dimension. Repeated indices
+            also end a run as a slice cannot have a step size of ``0``.
+
+        Args:
+            indices(list(int)):          a sequence of indices to group
+
+        Returns:
+            (list(tuple(slice, int))):   a list of slices and run lengths
+
+        Examples:
+
+            >>> coalesce_indices([0, 1, 2, 3, 7, 5, 3, 3, -1])
+            [(slice(0, 4, 1), 4), (slice(7, 1, -2), 3), (slice(3, 4, 1), 1), \
+(slice(-1, -2, -1), 1)]
+    """
+
+    if numpy is not None and isinstance(indices, numpy.ndarray):
+        indices = indices.tolist()
+
+    runs = []
+
+    n = len(indices)
+    i = 0
+    while i < n:
+        first = indices[i]
+        j = i + 1
+        step = 0
+        if j < n and ((indices[j] >= 0) == (first >= 0)):
+            step = indices[j] - first
+
+        if step != 0:
+            while (j + 1 < n and
+                   (indices[j + 1] - indices[j]) == step and
+                   ((indices[j + 1] >= 0) == (first >= 0))):
+                j += 1
+
+            last = indices[j]
+            stop = last + step
+            if (stop >= 0) != (last >= 0):
+                stop = None
+
+            runs.append((slice(first, stop, step), j - i + 1))
+            i = j + 1
+        else:
+            runs.append((index_to_slice(first), 1))
+            i += 1
+
+    return runs
+
+
+def unique_indices(slices, lengths=None):
+    """
+        Sorts and removes duplicates from each sequence of indices.
+
+        Some libraries (like h5py) require sequences of indices to be
+        increasing and repeated indices only read the same data again. So
+        this replaces each sequence with its sorted unique indices. These
+        slices can then be read (e.g. with ``split_indices``) and the
+        requested order restored with ``take`` along each result axis
+        using the inverse provided for it.
+
+        Note:
+            Without lengths, negative indices are placed after all
+            non-negative ones as they count from the end. However, a
+            negative and non-negative index referring to the same position
+            cannot be detected as duplicates without the length.
+
+        Args:
+            slices(tuple(slice)):        a tuple of slices to reformat.
+            lengths(tuple(int)):         a tuple of lengths to fill.
+
+        Returns:
+            (tuple, tuple):              the slices with sorted unique
+                                         sequences and the inverse for
+                                         each axis of the result (or
+                                         ``None`` if it is not needed).
+                                         Any ``Ellipsis`` is kept in place.
+
+        Examples:
+
+            >>> unique_indices((2, [5, 1, 5, 3], slice(None)), (4, 6, 3))
+            ((2, [1, 3, 5], slice(0, 3, 1)), ([2, 0, 2, 1], None))
+    """
+
+    ref_slices = reformat_slices(slices, lengths)
+
+    new_slices = []
+    inverses = []
+    for each_slice in ref_slices:
+        if numpy is not None and isinstance(each_slice, numpy.ndarray):
+            each_slice, each_inverse = numpy.unique(
+                each_slice, return_inverse=True
+            )
+            neg = numpy.searchsorted(each_slice, 0)
+            each_slice = numpy.concatenate(
+                [each_slice[neg:], each_slice[:neg]]
+            )
+            each_inverse = (each_inverse - neg) % max(len(each_slice), 1)
+            inverses.append(each_inverse.reshape(-1))
+        elif is_index_sequence(each_slice):
+            unique = sorted(set(each_slice), key=lambda i: (i < 0, i))
+            positions = dict((i, j) for j, i in enumerate(unique))
+
+            inverses.append([positions[i] for i in each_slice])
+            each_slice = unique
+        elif each_slice is Ellipsis:
+            inverses.append(Ellipsis)
+        elif not isinstance(each_slice, numbers.Integral):
+            inverses.append(None)
+
+        new_slices.append(each_slice)
+
+    return tuple(new_slices), tuple(inverses)
+
+
+def isplit_indices(slices, coalesce=False):
+    """
+        Splits slices with multiple indices into multiple splices lazily.
+
+        Behaves like ``split_indices``, but provides a generator that
+        constructs each tuple of slices as it is requested. This way reads
+        can begin with the first tuple of slices and memory usage stays
+        constant regardless of how many indices need to be split.
+
+        Args:
+            slices(tuple(slice)):        a tuple of slices to split
+            coalesce(bool):              whether to group runs of indices
+
+        Returns:
+            (generator(tuple(slice))):   a generator of tuples of slices \
+                                         (paired with where to place each \
+                                         result if ``coalesce``)
+
+        Examples:
+
+            >>> list(isplit_indices(
+            ...     (
+            ...         3,
+            ...         Ellipsis,
+            ...         [0, 1, 2],
+            ...         slice(2, 5),
+            ...         slice(4, 6, 2)
+            ...     )
+            ... ))  # doctest: +NORMALIZE_WHITESPACE
+            [(3, Ellipsis, slice(0, 1, 1), slice(2, 5, 1), slice(4, 6, 2)),
+             (3, Ellipsis, slice(1, 2, 1), slice(2, 5, 1), slice(4, 6, 2)),
+             (3, Ellipsis, slice(2, 3, 1), slice(2, 5, 1), slice(4, 6, 2))]
+    """
+
+    try:
+        from itertools import izip
+    except ImportError:
+        izip = zip
+
+    ref_slices = reformat_slices(slices)
+
+    mtx_slices = []
+    mtx_positions = []
+    seq_dims = []
+    for i, each_dim_slice in enumerate(ref_slices):
+        if is_index_sequence(each_dim_slice):
+            if coalesce:
+                each_dim_runs = []
+                each_dim_positions = []
+                offset = 0
+                for each_run, each_len in coalesce_indices(each_dim_slice):
+                    each_dim_runs.append(each_run)
+                    each_dim_positions.append(
+                        slice(offset, offset + each_len, 1)
+                    )
+                    offset += each_len
+
+                mtx_slices.append(each_dim_runs)
+                mtx_positions.append(each_dim_positions)
+            else:
+                if numpy is not None and isinstance(each_dim_slice,
+                                                    numpy.ndarray):
+                    each_dim_slice = each_dim_slice.tolist()
+
+                mtx_slices.append(each_dim_slice)
+                seq_dims.append(i)
+        else:
+            mtx_slices.append([each_dim_slice])
+            if each_dim_slice is Ellipsis:
+                mtx_positions.append([Ellipsis])
+            elif isinstance(each_dim_slice, slice):
+                mtx_positions.append([slice(None)])
+
+    # Only convert indices to slices as each result is requested.
+    def _isplit_indices():
+        for each_dim_slice in itertools.product(*mtx_slices):
+            each_dim_slice = list(each_dim_slice)
+            for i in seq_dims:
+                each_dim_slice[i] = index_to_slice(each_dim_slice[i])
+
+            yield tuple(each_dim_slice)
+
+    if coalesce:
+        return izip(_isplit_indices(), itertools.product(*mtx_positions))
+    else:
+        return _isplit_indices()
+
+
+def num_split_indices(slices, coalesce=False):
+    """
+        Determines how many slices ``split_indices`` will provide.
+
+        Computes the number without splitting any indices. So this is
+        cheap even when there are many indices to split.
+
+        Args:
+            slices(tuple(slice)):        a tuple of slices to split
+            coalesce(bool):              whether to group runs of indices
+
+        Returns:
+            (int):                       number of tuples of slices
+
+        Examples:
+
+            >>> num_split_indices(
+            ...     (
+            ...         3,
+            ...         Ellipsis,
+            ...         [0, 1, 2],
+            ...         slice(2, 5),
+            ...         slice(4, 6, 2)
+            ...     )
+            ... )
+            3
+
+            >>> num_split_indices(
+            ...     (
+            ...         3,
+            ...         Ellipsis,
+            ...         [0, 1, 2],
+            ...         slice(2, 5),
+            ...         slice(4, 6, 2)
+            ...     ),
+            ...     coalesce=True
+            ... )
+            1
+    """
+
+    ref_slices = reformat_slices(slices)
+
+    count = 1
+    for each_dim_slice in ref_slices:
+        if is_index_sequence(each_dim_slice):
+            if coalesce:
+                count *= len(coalesce_indices(each_dim_slice))
+            else:
+                count *= len(each_dim_slice)
+
+    return count
+
+
+def split_indices(slices, coalesce=False):
     """
         Splits slices with multiple indices into multiple splices.
 
@@ -316,11 +993,24 @@ def split_indices(slices):
         way, it is better than just getting a failure and should extend
         well to a variety of cases.
 
+        If ``coalesce`` is set, runs of indices that form an arithmetic
+        progression are combined into one slice (see ``coalesce_indices``).
+        So far fewer slices may be needed. In this case, a second list is
+        also provided with where each result goes in the full result.
+
+        Sequences on several axes are split independently and combined as
+        an outer product (matching ``reformat_slices``). So the number of
+        results is the product of the splits along each axis. These are
+        only generated as they are needed.
+
         Args:
             slices(tuple(slice)):        a tuple of slices to split
+            coalesce(bool):              whether to group runs of indices
 
         Returns:
-            (list(tuple(slice))):        a list of a tuple of slices
+            (list(tuple(slice))):        a list of a tuple of slices \
+                                         (and a list of where to place \
+                                         each result if ``coalesce``)
 
         Examples:
 
@@ -336,26 +1026,28 @@ def split_indices(slices):
             [(3, Ellipsis, slice(0, 1, 1), slice(2, 5, 1), slice(4, 6, 2)),
              (3, Ellipsis, slice(1, 2, 1), slice(2, 5, 1), slice(4, 6, 2)),
              (3, Ellipsis, slice(2, 3, 1), slice(2, 5, 1), slice(4, 6, 2))]
-    """
-
-    ref_slices = reformat_slices(slices)
 
-    mtx_slices = []
-    for each_dim_slice in ref_slices:
-        if each_dim_slice is Ellipsis:
-            mtx_slices.append([each_dim_slice])
-        elif isinstance(each_dim_slice, numbers.Integral):
-            mtx_slices.append([each_dim_slice])
-        elif isinstance(each_dim_slice, slice):
-            mtx_slices.append([each_dim_slice])
-        elif isinstance(each_dim_slice, collections.Sequence):
-            new_slice = []
-            for i in each_dim_slice:
-                new_slice.append(index_to_slice(i))
-            mtx_slices.append(new_slice)
+            >>> split_indices(
+            ...     (
+            ...         3,
+            ...         [0, 1, 2, 6, 4],
+            ...         slice(2, 5)
+            ...     ),
+            ...     coalesce=True
+            ... )  # doctest: +NORMALIZE_WHITESPACE
+            ([(3, slice(0, 3, 1), slice(2, 5, 1)),
+              (3, slice(6, 2, -2), slice(2, 5, 1))],
+             [(slice(0, 3, 1), slice(None, None, None)),
+              (slice(3, 5, 1), slice(None, None, None))])
+    """
 
-    result_slices = []
-    for each_dim_slice in itertools.product(*mtx_slices):
-        result_slices.append(tuple(each_dim_slice))
+    if coalesce:
+        result_slices = []
+        result_positions = []
+        for each_slices, each_positions in isplit_indices(slices, True):
+            result_slices.append(each_slices)
+            result_positions.append(each_positions)
 
-    return result_slices
+        return result_slices, result_positions
+    else:
+        return list(isplit_indices(slices))
@@ -4,8 +4,14 @@ __author__ = "John Kirkham <kirkhamj@janelia.hhmi.org>"
 __date__ = "$Dec 08, 2016 14:49:29 GMT-0500$"
 
 
+import functools
 import numbers
-import math
+import operator
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 import kenjutsu.format
 
@@ -50,8 +56,30 @@ def len_slice(a_slice, a_length=None):
             "An integral index does not provide an object with a length."
         )
 
+    if (isinstance(a_slice, kenjutsu.format.NormalizedSlice) and
+            (a_length is None or a_length == a_slice._a_length)):
+        return len(a_slice)
+
     new_slice = kenjutsu.format.reformat_slice(a_slice, a_length)
 
+    return _len_reformatted_slice(new_slice)
+
+
+def _len_reformatted_slice(new_slice):
+    """
+        Determines how many elements an already reformatted slice contains.
+
+        Raises:
+            UnknownSliceLengthException: Will raise an exception if
+            new_slice does not have a defined end point.
+
+        Args:
+            new_slice(slice):      a slice from ``reformat_slice``.
+
+        Returns:
+            (int):                 the number of elements in the slice.
+    """
+
     new_slice_size = 0
     if isinstance(new_slice, slice):
         if (new_slice.step > 0 and new_slice.start >= 0 and
@@ -67,18 +95,80 @@ def len_slice(a_slice, a_length=None):
                     " point. The reformatted slice was %s." % repr(new_slice)
                 )
 
-        if new_slice.step < 0 and new_slice.stop is None:
-            new_slice = slice(new_slice.start, -1, new_slice.step)
+        # Without a stop, run to the start or end of the dimension.
+        if new_slice.stop is None:
+            stop = -1 if new_slice.step < 0 else 0
+            new_slice = slice(new_slice.start, stop, new_slice.step)
 
-        new_slice_diff = float(new_slice.stop - new_slice.start)
-
-        new_slice_size = int(math.ceil(new_slice_diff / new_slice.step))
+        # Use ceiling division on integers to stay exact for any length.
+        new_slice_size = -(
+            (new_slice.start - new_slice.stop) // new_slice.step
+        )
     else:
         new_slice_size = len(new_slice)
 
     return(new_slice_size)
 
 
+def len_slice_arrays(starts, stops, steps, lengths=None):
+    """
+        Determines how many elements many slices will contain at once.
+
+        Provides the same result as calling ``len_slice`` with each slice
+        (and length) given. However, all of the slices are normalized
+        (see ``reformat_slice_arrays``) and measured together using NumPy
+        with integer arithmetic only. So the lengths are exact and a large
+        batch of slices can be measured with a single call.
+
+        Raises:
+            UnknownSliceLengthException: Will raise an exception if any
+            slice does not have a defined end point.
+
+        Args:
+            starts(array-like):          starts of slices to measure.
+            stops(array-like):           stops of slices to measure.
+            steps(array-like):           steps of slices to measure.
+            lengths(array-like):         lengths to fill if not provided.
+
+        Returns:
+            (numpy.ndarray):             the number of elements in each.
+
+        Examples:
+
+            >>> len_slice_arrays(
+            ...     numpy.ma.masked_equal([2, -20, -20], -20),
+            ...     numpy.ma.masked_equal([-1, -20, -20], -20),
+            ...     numpy.ma.masked_equal([-20, -20, -2], -20),
+            ...     10
+            ... ).tolist()
+            [7, 10, 5]
+    """
+
+    starts, stops, steps = kenjutsu.format.reformat_slice_arrays(
+        starts, stops, steps, lengths
+    )
+
+    stops_m = numpy.ma.getmaskarray(stops)
+    starts = starts.filled(0).astype(numpy.int64)
+    stops = stops.filled(-1).astype(numpy.int64)
+    steps = steps.filled(1).astype(numpy.int64)
+
+    # Without a stop, run to the start or end of the dimension.
+    stops[stops_m & (steps > 0)] = 0
+
+    unknown = (
+        ((steps > 0) & (starts >= 0) & (stops_m | (stops < 0))) |
+        ((steps < 0) & (starts < 0) & (stops_m | (stops >= 0)))
+    )
+    if unknown.any():
+        raise UnknownSliceLengthException(
+            "Cannot determine slice length without a defined end point."
+            " The number of slices affected was %i." % unknown.sum()
+        )
+
+    return -((starts - stops) // steps)
+
+
 def len_slices(slices, lengths=None):
     """
         Takes a tuple of slices and reformats them to fill in as many undefined
@@ -112,8 +202,274 @@ def len_slices(slices, lengths=None):
 
     for each_slice in new_slices:
         if not isinstance(each_slice, numbers.Integral):
-            lens.append(len_slice(each_slice))
+            lens.append(_len_reformatted_slice(each_slice))
 
     lens = tuple(lens)
 
     return(lens)
+
+
+def selection_shape(slices, shape):
+    """
+        Determines the shape of the result of a selection without reading.
+
+        Matches the shape NumPy would give for the selection. So axes
+        indexed with an integer are dropped and axes indexed with a
+        sequence have its length. Sequences on several axes are outer
+        indexed (see ``reformat_slices``).
+
+        Args:
+            slices(tuple(slice)):        a tuple of slices to measure.
+            shape(tuple(int)):           the shape they are applied to.
+
+        Returns:
+            (tuple(int)):                the shape of the result.
+
+        Examples:
+
+            >>> selection_shape(
+            ...     (3, slice(None, None, -2), [0, 4, 1]),
+            ...     (5, 10, 6)
+            ... )
+            (5, 3)
+    """
+
+    new_slices = kenjutsu.format.reformat_slices(slices, shape)
+
+    return tuple(
+        _len_reformatted_slice(each_slice) for each_slice in new_slices
+        if not isinstance(each_slice, numbers.Integral)
+    )
+
+
+def selection_nbytes(slices, shape, dtype):
+    """
+        Determines how many bytes the result of a selection will take.
+
+        Args:
+            slices(tuple(slice)):        a tuple of slices to measure.
+            shape(tuple(int)):           the shape they are applied to.
+            dtype(numpy.dtype):          the type of each element.
+
+        Returns:
+            (int):                       the number of bytes in the result.
+
+        Examples:
+
+            >>> selection_nbytes(
+            ...     (3, slice(None, None, -2), [0, 4, 1]),
+            ...     (5, 10, 6),
+            ...     numpy.float64
+            ... )
+            120
+    """
+
+    return functools.reduce(
+        operator.mul,
+        selection_shape(slices, shape),
+        int(numpy.dtype(dtype).itemsize)
+    )
+
+
+def _memory_indices(slices, shape, order):
+    """
+        Provides the indices, lengths, and strides of each axis in memory.
+
+        Axes are given from the slowest to the fastest changing in memory.
+        Strides are in elements. Each index is a reformatted slice, an
+        integer, or a sequence.
+    """
+
+    if order not in ("C", "F"):
+        raise ValueError(
+            "The `order` must be either \"C\" or \"F\". Instead got: %s." %
+            str(order)
+        )
+
+    new_slices = kenjutsu.format.reformat_slices(slices, shape)
+    shape = tuple(shape)
+    if order == "F":
+        new_slices = new_slices[::-1]
+        shape = shape[::-1]
+
+    strides = []
+    stride = 1
+    for each_length in reversed(shape):
+        strides.insert(0, stride)
+        stride *= each_length
+
+    return new_slices, shape, tuple(strides)
+
+
+def num_contiguous_runs(slices, shape, order="C"):
+    """
+        Determines how many contiguous runs of memory a selection reads.
+
+        Counts the runs that ``contiguous_runs`` would provide without
+        constructing them. Only the indices along each axis are examined.
+        So this is cheap even for selections with many runs.
+
+        Args:
+            slices(tuple(slice)):        a tuple of slices to read.
+            shape(tuple(int)):           the shape of the array read from.
+            order(str):                  memory layout (``"C"`` or ``"F"``).
+
+        Returns:
+            (int):                       the number of contiguous runs.
+
+        Examples:
+
+            >>> num_contiguous_runs((slice(1, 3), slice(None)), (4, 5))
+            1
+            >>> num_contiguous_runs((slice(1, 3), slice(1, None)), (4, 5))
+            2
+            >>> num_contiguous_runs(
+            ...     (slice(1, 3), slice(1, None)), (4, 5), order="F"
+            ... )
+            4
+    """
+
+    new_slices, shape, strides = _memory_indices(slices, shape, order)
+
+    lengths = []
+    for each_slice in new_slices:
+        if isinstance(each_slice, numbers.Integral):
+            lengths.append(1)
+        else:
+            lengths.append(_len_reformatted_slice(each_slice))
+
+    n_elements = functools.reduce(operator.mul, lengths, 1)
+    if n_elements == 0:
+        return 0
+
+    # Count pairs of consecutive elements that are adjacent in memory.
+    # Moving to the next index along an axis wraps every faster axis. So
+    # the offset changes by the step along the axis and by the wrap of
+    # each faster axis.
+    n_adjacent = 0
+    n_outer = 1
+    wraps = []
+    for each_slice, each_stride in zip(new_slices, strides):
+        if isinstance(each_slice, numbers.Integral):
+            wraps.append(0)
+        elif isinstance(each_slice, slice):
+            count = _len_reformatted_slice(each_slice)
+            wraps.append(-(count - 1) * each_slice.step * each_stride)
+        else:
+            wraps.append((each_slice[0] - each_slice[-1]) * each_stride)
+
+    for i, (each_slice, each_stride, each_length) in enumerate(
+            zip(new_slices, strides, lengths)):
+        wrap = sum(wraps[i + 1:])
+        if isinstance(each_slice, numbers.Integral):
+            pass
+        elif isinstance(each_slice, slice):
+            if each_slice.step * each_stride + wrap == 1:
+                n_adjacent += n_outer * (each_length - 1)
+        else:
+            diffs = numpy.diff(numpy.asarray(each_slice, dtype=numpy.int64))
+            n_adjacent += n_outer * int(
+                (diffs * each_stride + wrap == 1).sum()
+            )
+
+        n_outer *= each_length
+
+    return n_elements - n_adjacent
+
+
+def contiguous_runs(slices, shape, itemsize, order="C"):
+    """
+        Finds the contiguous runs of memory a selection reads.
+
+        Takes a selection of an array with ``shape`` stored with
+        ``itemsize`` bytes per element in ``order``. Provides the byte
+        offset and number of bytes of each run of memory that is read.
+        Runs are merged across axes whenever they meet in memory (e.g.
+        when the faster axes are fully selected). Runs are given in the
+        order the selection visits them when iterating in ``order``. So
+        the data from each run can be placed one after the other in a
+        result with the same ``order``.
+
+        Args:
+            slices(tuple(slice)):        a tuple of slices to read.
+            shape(tuple(int)):           the shape of the array read from.
+            itemsize(int):               the number of bytes per element.
+            order(str):                  memory layout (``"C"`` or ``"F"``).
+
+        Returns:
+            (tuple(numpy.ndarray)):      the byte offset and number of
+                                         bytes of each run.
+
+        Examples:
+
+            >>> offsets, nbytes = contiguous_runs(
+            ...     (slice(1, 3), slice(1, None)), (4, 5), 8
+            ... )
+            >>> offsets.tolist(), nbytes.tolist()
+            ([48, 88], [32, 32])
+
+            >>> offsets, nbytes = contiguous_runs(
+            ...     (slice(1, 3), slice(None)), (4, 5), 8
+            ... )
+            >>> offsets.tolist(), nbytes.tolist()
+            ([40], [80])
+    """
+
+    new_slices, shape, strides = _memory_indices(slices, shape, order)
+
+    indices = []
+    for each_slice in new_slices:
+        if isinstance(each_slice, numbers.Integral):
+            indices.append(numpy.array([each_slice], dtype=numpy.int64))
+        elif isinstance(each_slice, slice):
+            count = _len_reformatted_slice(each_slice)
+            indices.append(
+                each_slice.start +
+                each_slice.step * numpy.arange(count, dtype=numpy.int64)
+            )
+        else:
+            indices.append(numpy.asarray(each_slice, dtype=numpy.int64))
+
+    if not indices:
+        indices.append(numpy.zeros((1,), dtype=numpy.int64))
+        shape = (1,)
+        strides = (1,)
+    elif any(len(each_indices) == 0 for each_indices in indices):
+        return (
+            numpy.zeros((0,), dtype=numpy.int64),
+            numpy.zeros((0,), dtype=numpy.int64)
+        )
+
+    # Fold fully selected fast axes into the size of each block.
+    block = 1
+    while len(indices) > 1 and (
+            len(indices[-1]) == shape[len(indices) - 1] and
+            (numpy.diff(indices[-1]) == 1).all()):
+        block *= len(indices[-1])
+        indices.pop()
+        strides = strides[:-1]
+
+    # Split the fastest axis into runs of consecutive indices.
+    fast = indices[-1]
+    breaks = numpy.flatnonzero(numpy.diff(fast) != 1) + 1
+    seg_starts = numpy.concatenate([[0], breaks])
+    seg_lengths = numpy.diff(numpy.concatenate([seg_starts, [len(fast)]]))
+
+    # Find where each run begins for every index of the slower axes.
+    bases = numpy.zeros((), dtype=numpy.int64)
+    for each_indices, each_stride in zip(indices[:-1], strides[:-1]):
+        bases = numpy.add.outer(bases, each_indices * each_stride)
+
+    starts = numpy.add.outer(bases, fast[seg_starts] * strides[-1])
+    starts = starts.ravel()
+    lengths = numpy.broadcast_to(
+        seg_lengths * block, bases.shape + seg_lengths.shape
+    ).ravel()
+
+    # Merge runs that end where the next one begins.
+    gaps = starts[1:] != (starts[:-1] + lengths[:-1])
+    first = numpy.concatenate([[0], numpy.flatnonzero(gaps) + 1])
+    starts = starts[first]
+    lengths = numpy.add.reduceat(lengths, first)
+
+    return starts * itemsize, lengths * itemsize
@@ -1,4 +1,560 @@
+from __future__ import absolute_import
+
 __author__ = "John Kirkham <kirkhamj@janelia.hhmi.org>"
 __date__ = "$Dec 08, 2016 16:20:14 GMT-0500$"
 
 
+import functools
+import numbers
+
+import kenjutsu.format
+import kenjutsu.measure
+
+try:
+    from math import gcd
+except ImportError:
+    from fractions import gcd
+
+
+def _index_view(a_slice):
+    """
+        Provides the first index, step, and count of a reformatted slice.
+    """
+
+    count = kenjutsu.measure._len_reformatted_slice(a_slice)
+
+    return a_slice.start, a_slice.step, count
+
+
+def _ascending_view(a_slice):
+    """
+        Provides the lowest index, step, and count of a reformatted slice.
+
+        The step is always positive. So the indices are given in ascending
+        order regardless of the direction of the slice.
+    """
+
+    start, step, count = _index_view(a_slice)
+    if step < 0:
+        start += (count - 1) * step
+        step = -step
+
+    return start, step, count
+
+
+def _inverse_mod(a, m):
+    """
+        Finds the inverse of ``a`` modulo ``m`` (assumed to be coprime).
+    """
+
+    old_r, r = a % m, m
+    old_x, x = 1, 0
+    while r:
+        q = old_r // r
+        old_r, r = r, old_r - q * r
+        old_x, x = x, old_x - q * x
+
+    return old_x % m
+
+
+def _index_bounds(index):
+    """
+        Provides the lowest index, highest index, and step of an index.
+
+        The step is the largest one that lands on every index from the
+        lowest one. It is ``0`` if there is only one index. If there are
+        no indices, ``None`` is returned instead.
+    """
+
+    if isinstance(index, numbers.Integral):
+        return index, index, 0
+    elif isinstance(index, slice):
+        start, step, count = _ascending_view(index)
+        if count == 0:
+            return None
+        elif count == 1:
+            step = 0
+
+        return start, start + (count - 1) * step, step
+    else:
+        if len(index) == 0:
+            return None
+
+        lo = min(index)
+        hi = max(index)
+        step = functools.reduce(gcd, (abs(int(i) - lo) for i in index), 0)
+
+        return int(lo), int(hi), step
+
+
+def _contains(index, i):
+    """
+        Determines whether a reformatted index includes the given index.
+    """
+
+    if isinstance(index, numbers.Integral):
+        return index == i
+    elif isinstance(index, slice):
+        start, step, count = _ascending_view(index)
+        return (
+            start <= i < start + count * step and (i - start) % step == 0
+        )
+    else:
+        return i in index
+
+
+def intersect(a, b, length):
+    """
+        Finds the indices that two indices of the same length share.
+
+        Works out the intersection exactly. In particular, intersecting
+        two slices with different steps and offsets gives a slice with
+        their common step (if they share any indices). Integral indices
+        and sequences of indices are also supported. Any slice provided
+        has an ascending step as the intersection does not have an order.
+        If nothing is shared, ``None`` is provided.
+
+        Args:
+            a(slice):                    an index to intersect.
+            b(slice):                    another index to intersect.
+            length(int):                 the length both are applied to.
+
+        Returns:
+            (slice):                     the shared indices (or ``None``).
+
+        Examples:
+
+            >>> intersect(slice(1, None, 4), slice(None, None, -6), 30)
+            slice(5, 30, 12)
+
+            >>> intersect(slice(1, None, 4), slice(0, None, 2), 30) is None
+            True
+
+            >>> intersect(slice(1, None, 4), [13, 1, 3, 5], 30)
+            [1, 5, 13]
+
+            >>> intersect(slice(1, None, 4), -5, 30)
+            25
+    """
+
+    a = kenjutsu.format.reformat_slice(a, length)
+    b = kenjutsu.format.reformat_slice(b, length)
+
+    a_is_slice = isinstance(a, slice)
+    b_is_slice = isinstance(b, slice)
+
+    if isinstance(a, numbers.Integral) or isinstance(b, numbers.Integral):
+        if isinstance(b, numbers.Integral):
+            a, b = b, a
+
+        return a if _contains(b, a) else None
+    elif not (a_is_slice and b_is_slice):
+        if not a_is_slice:
+            a, b = b, a
+
+        result = sorted(set(int(i) for i in b if _contains(a, i)))
+
+        return result if result else None
+
+    a_start, a_step, a_count = _ascending_view(a)
+    b_start, b_step, b_count = _ascending_view(b)
+    if a_count == 0 or b_count == 0:
+        return None
+
+    # Find the first index both land on using the Chinese remainder theorem.
+    step_gcd = gcd(a_step, b_step)
+    if (b_start - a_start) % step_gcd:
+        return None
+
+    step = (a_step // step_gcd) * b_step
+    k = ((b_start - a_start) // step_gcd) * _inverse_mod(
+        a_step // step_gcd, b_step // step_gcd
+    )
+    start = a_start + (k % (b_step // step_gcd)) * a_step
+
+    lo = max(a_start, b_start)
+    hi = min(a_start + a_count * a_step - a_step + 1,
+             b_start + b_count * b_step - b_step + 1)
+
+    if start < lo:
+        start += -(-(lo - start) // step) * step
+    if start >= hi:
+        return None
+
+    return kenjutsu.format.reformat_slice(slice(start, hi, step), length)
+
+
+def cover(a, b, length):
+    """
+        Finds the smallest slice including all indices of two indices.
+
+        The union of two slices is not a slice in general. Instead this
+        finds the smallest slice that includes every index in both. Its
+        step is the largest that still lands on all of these. So reading
+        this slice once reads everything that either index would read.
+        Integral indices and sequences of indices are also supported. If
+        both are empty, ``None`` is provided.
+
+        Args:
+            a(slice):                    an index to cover.
+            b(slice):                    another index to cover.
+            length(int):                 the length both are applied to.
+
+        Returns:
+            (slice):                     a slice covering both (or ``None``).
+
+        Examples:
+
+            >>> cover(slice(1, 10, 4), slice(13, 20, 6), 30)
+            slice(1, 20, 2)
+
+            >>> cover(slice(2, 5), [7, 9], 30)
+            slice(2, 10, 1)
+
+            >>> cover(-3, 27, 30)
+            27
+    """
+
+    a = kenjutsu.format.reformat_slice(a, length)
+    b = kenjutsu.format.reformat_slice(b, length)
+
+    if (isinstance(a, numbers.Integral) and
+            isinstance(b, numbers.Integral) and a == b):
+        return a
+
+    a_bounds = _index_bounds(a)
+    b_bounds = _index_bounds(b)
+
+    if a_bounds is None:
+        a_bounds, b_bounds = b_bounds, a_bounds
+    if a_bounds is None:
+        return None
+    elif b_bounds is None:
+        b_bounds = a_bounds
+
+    lo = min(a_bounds[0], b_bounds[0])
+    hi = max(a_bounds[1], b_bounds[1])
+    step = functools.reduce(gcd, [
+        a_bounds[2], b_bounds[2], a_bounds[0] - lo, b_bounds[0] - lo
+    ])
+
+    return kenjutsu.format.reformat_slice(
+        slice(lo, hi + 1, step or 1), length
+    )
+
+
+def intersect_slices(a, b, shape):
+    """
+        Finds the indices that two tuples of slices of the same shape share.
+
+        Applies ``intersect`` to each axis (see it for more details). If
+        any axis shares nothing, then nothing is shared at all. So ``None``
+        is provided as soon as this is found.
+
+        Args:
+            a(tuple(slice)):             slices to intersect.
+            b(tuple(slice)):             other slices to intersect.
+            shape(tuple(int)):           the shape both are applied to.
+
+        Returns:
+            (tuple(slice)):              the shared indices (or ``None``).
+
+        Examples:
+
+            >>> intersect_slices(
+            ...     (slice(2, 8), slice(None, None, 2)),
+            ...     (slice(5, None), slice(None, None, -3)),
+            ...     (10, 12)
+            ... )
+            (slice(5, 8, 1), slice(2, 11, 6))
+
+            >>> intersect_slices(
+            ...     (slice(2, 8), 3), (slice(5, None), 4), (10, 12)
+            ... ) is None
+            True
+    """
+
+    a = kenjutsu.format.reformat_slices(a, shape)
+    b = kenjutsu.format.reformat_slices(b, shape)
+
+    result = []
+    for each_a, each_b, each_length in zip(a, b, shape):
+        each_result = intersect(each_a, each_b, each_length)
+        if each_result is None:
+            return None
+
+        result.append(each_result)
+
+    return tuple(result)
+
+
+def cover_slices(a, b, shape):
+    """
+        Finds the smallest tuple of slices including two tuples of slices.
+
+        Applies ``cover`` to each axis (see it for more details). So the
+        result reads a box including everything either would read. If
+        either is empty, the other is provided as is. If both are empty,
+        ``None`` is provided.
+
+        Args:
+            a(tuple(slice)):             slices to cover.
+            b(tuple(slice)):             other slices to cover.
+            shape(tuple(int)):           the shape both are applied to.
+
+        Returns:
+            (tuple(slice)):              slices covering both (or ``None``).
+
+        Examples:
+
+            >>> cover_slices(
+            ...     (slice(2, 8), 5),
+            ...     (slice(5, None), slice(None, None, -3)),
+            ...     (10, 12)
+            ... )
+            (slice(2, 10, 1), slice(2, 12, 3))
+    """
+
+    a = kenjutsu.format.reformat_slices(a, shape)
+    b = kenjutsu.format.reformat_slices(b, shape)
+
+    if any(_index_bounds(e) is None for e in b):
+        b = a
+    if any(_index_bounds(e) is None for e in a):
+        a = b
+    if any(_index_bounds(e) is None for e in a):
+        return None
+
+    result = []
+    for each_a, each_b, each_length in zip(a, b, shape):
+        result.append(cover(each_a, each_b, each_length))
+
+    return tuple(result)
+
+
+def compose(outer, inner, length):
+    """
+        Combines two slices applied one after the other into one.
+
+        Finds the index equivalent to applying ``outer`` to something with
+        ``length`` and then applying ``inner`` to the result. This way a
+        view of a view can be read with a single index instead. Negative
+        steps, integral indices, and sequences of indices are all
+        supported.
+
+        Args:
+            outer(slice):                the first index to apply.
+            inner(slice):                the index to apply to the result.
+            length(int):                 the length to apply ``outer`` to.
+
+        Returns:
+            (slice):                     the index equivalent to both.
+
+        Examples:
+
+            >>> compose(slice(2, None), slice(None, None, -2), 10)
+            slice(9, 1, -2)
+
+            >>> compose(slice(None, None, -1), -2, 10)
+            1
+
+            >>> compose(slice(1, None, 3), [2, 0], 10)
+            [7, 1]
+    """
+
+    try:
+        irange = xrange
+    except NameError:
+        irange = range
+
+    outer = kenjutsu.format.reformat_slice(outer, length)
+    if isinstance(outer, numbers.Integral):
+        raise TypeError(
+            "Cannot apply an index after an integral index."
+            " Instead got `%s` as the outer index." % str(outer)
+        )
+
+    is_outer_slice = isinstance(outer, slice)
+    if is_outer_slice:
+        start, step, count = _index_view(outer)
+    else:
+        count = len(outer)
+
+    if count == 0:
+        # Nothing is left to select from.
+        if (isinstance(inner, numbers.Integral) or
+                (kenjutsu.format.is_index_sequence(inner) and len(inner))):
+            raise IndexError("Index out of range.")
+        elif isinstance(inner, irange):
+            return slice(0, 0, 1)
+        elif kenjutsu.format.is_index_sequence(inner):
+            return inner[:0]
+        else:
+            kenjutsu.format.reformat_slice(inner)
+            return slice(0, 0, 1)
+
+    inner = kenjutsu.format.reformat_slice(inner, count)
+
+    if not is_outer_slice:
+        # Sequences of indices simply select from the sequence.
+        if isinstance(inner, (numbers.Integral, slice)):
+            return outer[inner]
+        elif isinstance(outer, list):
+            return [outer[i] for i in inner]
+        else:
+            return outer[inner]
+
+    if isinstance(inner, numbers.Integral):
+        return start + inner * step
+    elif isinstance(inner, slice):
+        inner_start, inner_step, inner_count = _index_view(inner)
+
+        new_start = start + inner_start * step
+        new_step = step * inner_step
+
+        return kenjutsu.format.range_to_slice(
+            irange(new_start, new_start + inner_count * new_step, new_step),
+            length
+        )
+    elif isinstance(inner, list):
+        return [start + i * step for i in inner]
+    else:
+        return start + inner * step
+
+
+def compose_slices(outer, inner, shape):
+    """
+        Combines two tuples of slices applied one after the other into one.
+
+        Finds the tuple of slices equivalent to applying ``outer`` to an
+        array with ``shape`` and then applying ``inner`` to the result. As
+        with NumPy, any axis indexed with an integer in ``outer`` is
+        dropped before ``inner`` is applied. This way a chain of views can
+        be read with a single tuple of slices instead.
+
+        Args:
+            outer(tuple(slice)):         the first slices to apply.
+            inner(tuple(slice)):         the slices to apply to the result.
+            shape(tuple(int)):           the shape to apply ``outer`` to.
+
+        Returns:
+            (tuple(slice)):              the slices equivalent to both.
+
+        Examples:
+
+            >>> compose_slices(
+            ...     (slice(2, None), 3, slice(None, None, -1)),
+            ...     (slice(None, None, 2), 1),
+            ...     (10, 5, 4)
+            ... )
+            (slice(2, 10, 2), 3, 2)
+    """
+
+    outer = kenjutsu.format.reformat_slices(outer, shape)
+    outer_shape = kenjutsu.measure.len_slices(outer)
+    inner = kenjutsu.format.reformat_slices(inner, outer_shape)
+
+    result = []
+    inner = iter(inner)
+    for each_outer, each_length in zip(outer, shape):
+        if isinstance(each_outer, numbers.Integral):
+            result.append(each_outer)
+        else:
+            result.append(compose(each_outer, next(inner), each_length))
+
+    return tuple(result)
+
+
+def forward_slice(a_slice, length):
+    """
+        Rewrites an index to read forward and whether to flip the result.
+
+        Some storage backends read slowly or not at all with a negative
+        step. So this finds an index that reads the same elements with a
+        positive step. If reading forward reverses the result, the result
+        needs to be flipped (e.g. a ``slice(None, None, -1)`` view) to
+        match the original index.
+
+        Note:
+            Sequences are reversed if they are strictly decreasing. Other
+            sequences are left as is.
+
+        Args:
+            a_slice(slice):              the index to read forward.
+            length(int):                 the length it is applied to.
+
+        Returns:
+            (tuple):                     the forward index and whether to
+                                         flip the result.
+
+        Examples:
+
+            >>> forward_slice(slice(None, None, -2), 10)
+            (slice(1, 10, 2), True)
+            >>> forward_slice(slice(2, 8), 10)
+            (slice(2, 8, 1), False)
+            >>> forward_slice([7, 4, 1], 10)
+            ([1, 4, 7], True)
+    """
+
+    a_slice = kenjutsu.format.reformat_slice(a_slice, length)
+
+    if isinstance(a_slice, numbers.Integral):
+        return a_slice, False
+    elif isinstance(a_slice, slice):
+        if a_slice.step > 0:
+            return a_slice, False
+
+        start, step, count = _ascending_view(a_slice)
+        if count == 0:
+            return slice(0, 0, 1), False
+
+        return slice(start, start + (count - 1) * step + 1, step), True
+    else:
+        flip = len(a_slice) > 1 and all(
+            i > j for i, j in zip(a_slice[:-1], a_slice[1:])
+        )
+        if flip:
+            a_slice = a_slice[::-1]
+
+        return a_slice, bool(flip)
+
+
+def forward_slices(slices, shape):
+    """
+        Rewrites a tuple of slices to read forward with flips to apply.
+
+        Applies ``forward_slice`` to each axis (see it for more details).
+        The flips are given for each axis of the result. So axes indexed
+        with an integer are dropped. Flipping the result afterwards only
+        creates a view. So no copy is needed.
+
+        Args:
+            slices(tuple(slice)):        slices to read forward.
+            shape(tuple(int)):           the shape they are applied to.
+
+        Returns:
+            (tuple):                     the forward slices and whether to
+                                         flip each axis of the result.
+
+        Examples:
+
+            >>> forward_slices(
+            ...     (slice(None, None, -1), 3, slice(1, 6, 2)),
+            ...     (4, 5, 6)
+            ... )
+            ((slice(0, 4, 1), 3, slice(1, 6, 2)), (True, False))
+    """
+
+    slices = kenjutsu.format.reformat_slices(slices, shape)
+
+    result = []
+    flips = []
+    for each_slice, each_length in zip(slices, shape):
+        each_slice, each_flip = forward_slice(each_slice, each_length)
+
+        result.append(each_slice)
+        if not isinstance(each_slice, numbers.Integral):
+            flips.append(each_flip)
+
+    return tuple(result), tuple(flips)
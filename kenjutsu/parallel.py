@@ -0,0 +1,329 @@
+from __future__ import absolute_import
+
+__author__ = "John Kirkham <kirkhamj@janelia.hhmi.org>"
+__date__ = "$Oct 18, 2026 01:03:35 GMT+0000$"
+
+
+import concurrent.futures
+import functools
+import mmap
+import multiprocessing
+import operator
+import os
+import tempfile
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    shared_memory = None
+
+
+class SharedArray(object):
+    """
+        An array that worker processes can write to without copying.
+
+        Allocates the array in shared memory (using
+        ``multiprocessing.shared_memory``) or, where that is unavailable,
+        in a temporary file mapped into memory. Passing this as the
+        destination of ``map_blocks`` with processes lets each worker
+        write its results straight into the array. So results are not
+        pickled and sent back. The array is available as ``array``.
+
+        Note:
+            The memory is released by ``close`` (or on leaving a ``with``
+            block). Copy anything needed out of ``array`` first.
+
+        Args:
+            shape(tuple(int)):             shape of the array.
+            dtype(numpy.dtype):            type of the array.
+            order(str):                    memory layout (``"C"`` or
+                                           ``"F"``).
+
+        Examples:
+
+            >>> with SharedArray((2, 3), int) as a:
+            ...     a.array[...] = 1
+            ...     int(a.array.sum())
+            6
+    """
+
+    def __init__(self, shape, dtype, order="C"):
+        shape = tuple(shape)
+        dtype = numpy.dtype(dtype)
+        nbytes = functools.reduce(operator.mul, shape, dtype.itemsize)
+
+        self._shm = None
+        self._filename = None
+        if shared_memory is not None:
+            self._shm = shared_memory.SharedMemory(
+                create=True, size=max(nbytes, 1)
+            )
+            self._target = ("shm", self._shm.name, shape, dtype, order)
+            self.array = numpy.ndarray(
+                shape, dtype, buffer=self._shm.buf, order=order
+            )
+        else:
+            fd, self._filename = tempfile.mkstemp(suffix=".dat")
+            os.close(fd)
+            self._target = ("file", self._filename, 0, shape, dtype, order)
+            self.array = numpy.memmap(
+                self._filename, dtype, "w+", shape=shape, order=order
+            )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __repr__(self):
+        return "%s(%s, %s)" % (
+            type(self).__name__,
+            str(self.array.shape),
+            str(self.array.dtype)
+        )
+
+    def close(self):
+        """
+            Releases the memory of the array.
+        """
+
+        self.array = None
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+        if self._filename is not None:
+            os.remove(self._filename)
+            self._filename = None
+
+
+def _shared_target(dst):
+    """
+        Describes how a worker process can open the destination array.
+
+        Provides ``None`` if workers cannot write to it directly.
+    """
+
+    if isinstance(dst, SharedArray):
+        return dst._target
+    elif (numpy is not None and
+            isinstance(dst, numpy.memmap) and
+            isinstance(dst.base, mmap.mmap) and
+            dst.mode in ("r+", "w+") and
+            dst.filename is not None):
+        order = "F" if dst.flags.f_contiguous and dst.ndim > 1 else "C"
+        return ("file", dst.filename, dst.offset, dst.shape, dst.dtype, order)
+
+    return None
+
+
+def _write_target(target, core, result):
+    """
+        Writes a result into the destination array described in a worker.
+
+        The destination is opened for this write only and closed again. So
+        nothing stays mapped in the worker once the block is written.
+    """
+
+    if target[0] == "shm":
+        kind, name, shape, dtype, order = target
+        shm = shared_memory.SharedMemory(name=name)
+        try:
+            numpy.ndarray(
+                shape, dtype, buffer=shm.buf, order=order
+            )[core] = result
+        finally:
+            shm.close()
+    else:
+        kind, filename, offset, shape, dtype, order = target
+        array = numpy.memmap(
+            filename, dtype, "r+", offset, shape=shape, order=order
+        )
+        array[core] = result
+        del array
+
+
+def _block_slicings(each_block):
+    """
+        Provides the core, haloed, and trimmed slicings of a block.
+    """
+
+    try:
+        return each_block.core, each_block.haloed, each_block.trimmed
+    except AttributeError:
+        return tuple(each_block)
+
+
+def _read_apply(func, src, haloed, trimmed):
+    """
+        Reads a haloed block, applies the function, and trims the result.
+    """
+
+    return func(src[haloed])[trimmed]
+
+
+def _apply_trim(func, data, trimmed):
+    """
+        Applies the function to a block and trims the result.
+    """
+
+    return func(data)[trimmed]
+
+
+def _apply_write(func, data, target, core, trimmed):
+    """
+        Applies the function to a block and writes it to the destination.
+    """
+
+    _write_target(target, core, func(data)[trimmed])
+
+
+def map_blocks(func, src, dst, blocks, executor="thread", max_workers=None,
+               max_in_flight=None):
+    """
+        Applies a function to each block of an array in parallel.
+
+        For each block, reads the ``haloed`` slicing from ``src``, applies
+        ``func`` to it, removes the halo from the result with the
+        ``trimmed`` slicing, and writes it to the ``core`` slicing of
+        ``dst``. Blocks are run on a ``concurrent.futures`` executor.
+        Only ``max_in_flight`` blocks are submitted at a time. So the
+        memory used stays bounded no matter how many blocks there are.
+
+        Note:
+            Writes to ``dst`` normally happen in the calling thread. So
+            ``dst`` does not need to support concurrent writes. With
+            threads, blocks are also read from ``src`` in the workers.
+            With processes, blocks are read in the calling thread and sent
+            to the workers. So ``func`` and the blocks must be picklable.
+
+        Note:
+            Results are trimmed in the workers. With processes, the
+            trimmed results are sent back to the calling process
+            unless ``dst`` is a ``SharedArray`` or a writable
+            ``numpy.memmap``. Then each worker writes its trimmed result
+            into the core of ``dst`` itself. Blocks do not overlap in
+            ``dst``. So no locking is needed.
+
+        Args:
+            func(callable):              function to apply to each block.
+            src(array-like):             array to read blocks from.
+            dst(array-like):             array (or ``SharedArray``) to
+                                         write results to.
+            blocks(iterable):            a ``BlockGrid``, the ``Block``s
+                                         from one, or the ``core``,
+                                         ``haloed``, and ``trimmed``
+                                         slicings of each block (e.g.
+                                         ``zip(*split_blocks(...))``).
+            executor(str or Executor):   ``"thread"``, ``"process"``, or an
+                                         existing ``Executor`` to use.
+            max_workers(int):            workers to start (if creating an
+                                         executor).
+            max_in_flight(int):          most blocks submitted at a time
+                                         (twice the workers by default).
+
+        Returns:
+            (array-like):                ``dst`` with all blocks written.
+
+        Examples:
+
+            >>> import numpy
+            >>> from kenjutsu.blocks import BlockGrid
+            >>> a = numpy.arange(12.0).reshape(3, 4)
+            >>> b = numpy.zeros_like(a)
+            >>> map_blocks(
+            ...     lambda e: e.sum(axis=1, keepdims=True) + 0 * e,
+            ...     a, b, BlockGrid(a.shape, (1, 2), (0, 1))
+            ... )
+            array([[ 3.,  3.,  6.,  6.],
+                   [15., 15., 18., 18.],
+                   [27., 27., 30., 30.]])
+    """
+
+    if max_workers is None:
+        max_workers = multiprocessing.cpu_count()
+
+    own_executor = False
+    if executor == "thread":
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers)
+        own_executor = True
+    elif executor == "process":
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers)
+        own_executor = True
+    elif not isinstance(executor, concurrent.futures.Executor):
+        raise TypeError(
+            "Expected `\"thread\"`, `\"process\"`, or an `Executor`."
+            " Instead got `%s`." % str(executor)
+        )
+
+    if max_in_flight is None:
+        max_in_flight = 2 * max_workers
+    if max_in_flight < 1:
+        raise ValueError(
+            "The `max_in_flight` must be positive definite."
+            " Instead got: %s." % str(max_in_flight)
+        )
+
+    read_in_worker = not isinstance(
+        executor, concurrent.futures.ProcessPoolExecutor
+    )
+
+    target = None
+    if not read_in_worker:
+        target = _shared_target(dst)
+
+    dst_array = dst
+    if isinstance(dst, SharedArray):
+        dst_array = dst.array
+
+    def _write_done(done):
+        for each_future in done:
+            each_core = pending.pop(each_future)
+            each_result = each_future.result()
+            if target is None:
+                dst_array[each_core] = each_result
+
+    pending = {}
+    try:
+        for each_block in blocks:
+            each_core, each_haloed, each_trimmed = _block_slicings(each_block)
+
+            if len(pending) >= max_in_flight:
+                done, not_done = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                _write_done(done)
+
+            if read_in_worker:
+                each_future = executor.submit(
+                    _read_apply, func, src, each_haloed, each_trimmed
+                )
+            elif target is not None:
+                each_future = executor.submit(
+                    _apply_write,
+                    func, src[each_haloed], target, each_core, each_trimmed
+                )
+            else:
+                each_future = executor.submit(
+                    _apply_trim, func, src[each_haloed], each_trimmed
+                )
+            pending[each_future] = each_core
+
+        while pending:
+            done, not_done = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            _write_done(done)
+    finally:
+        for each_future in pending:
+            each_future.cancel()
+        if own_executor:
+            executor.shutdown(wait=True)
+
+    return dst
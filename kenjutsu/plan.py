@@ -0,0 +1,244 @@
+from __future__ import absolute_import
+
+__author__ = "John Kirkham <kirkhamj@janelia.hhmi.org>"
+__date__ = "$Oct 18, 2026 00:50:23 GMT+0000$"
+
+
+import functools
+import numbers
+import operator
+
+import kenjutsu.format
+import kenjutsu.measure
+
+
+def _box_volume(box):
+    """
+        Computes the number of elements in a box of bounds.
+    """
+
+    return functools.reduce(
+        operator.mul, (max(hi - lo, 0) for lo, hi in box), 1
+    )
+
+
+def _box_cover(a, b):
+    """
+        Finds the smallest box containing both boxes.
+    """
+
+    return tuple(
+        (min(a_lo, b_lo), max(a_hi, b_hi))
+        for (a_lo, a_hi), (b_lo, b_hi) in zip(a, b)
+    )
+
+
+def _box_intersect(a, b):
+    """
+        Finds the box contained in both boxes (may have no volume).
+    """
+
+    return tuple(
+        (max(a_lo, b_lo), min(a_hi, b_hi))
+        for (a_lo, a_hi), (b_lo, b_hi) in zip(a, b)
+    )
+
+
+def _merge_cost(a, b):
+    """
+        Computes the number of unrequested elements read by merging boxes.
+    """
+
+    return (
+        _box_volume(_box_cover(a, b)) -
+        _box_volume(a) -
+        _box_volume(b) +
+        _box_volume(_box_intersect(a, b))
+    )
+
+
+def _box_first_bounds(box):
+    """
+        Finds the bounds of a box along its first axis.
+    """
+
+    if not box:
+        return (0, 1)
+
+    return box[0]
+
+
+def _selection_box(slices):
+    """
+        Finds the bounds of reformatted slices (``None`` if empty).
+    """
+
+    box = []
+    for each_slice in slices:
+        if isinstance(each_slice, numbers.Integral):
+            box.append((each_slice, each_slice + 1))
+        elif isinstance(each_slice, slice):
+            count = kenjutsu.measure._len_reformatted_slice(each_slice)
+            if count == 0:
+                return None
+
+            first = each_slice.start
+            last = first + (count - 1) * each_slice.step
+            box.append((min(first, last), max(first, last) + 1))
+        else:
+            if len(each_slice) == 0:
+                return None
+
+            box.append((int(min(each_slice)), int(max(each_slice)) + 1))
+
+    return tuple(box)
+
+
+def _shift_slices(slices, box):
+    """
+        Offsets reformatted slices to be relative to the start of a box.
+    """
+
+    result = []
+    for each_slice, (each_lo, each_hi) in zip(slices, box):
+        if isinstance(each_slice, numbers.Integral):
+            result.append(each_slice - each_lo)
+        elif isinstance(each_slice, slice):
+            start = each_slice.start - each_lo
+            stop = each_slice.stop
+            if stop is not None:
+                stop -= each_lo
+                if stop < 0:
+                    stop = None
+            result.append(slice(start, stop, each_slice.step))
+        else:
+            result.append([int(i) - each_lo for i in each_slice])
+
+    return tuple(result)
+
+
+def plan_reads(selections, shape, gap=0):
+    """
+        Plans a small set of reads that covers many selections.
+
+        Takes several selections from an array with ``shape`` and merges
+        the boxes bounding them into fewer boxes to read. Boxes that
+        overlap are always merged. So no element is read twice. Other boxes
+        are merged as long as doing so reads no more than ``gap`` elements
+        that were not already read by either box. So adjacent boxes that
+        together fill a box are always merged too and a larger ``gap``
+        trades reading unused elements for fewer reads.
+
+        Along with the reads, a scatter plan is provided. This has an
+        entry for each selection with the index of the read containing it
+        and the slicing to apply to the result of that read to get the
+        selection. Selections that are empty get ``None`` for both.
+
+        Note:
+            The reads are sorted by their starting positions. So they
+            proceed through storage in C order as best as possible.
+
+        Args:
+            selections(list):            a list of selections to read.
+            shape(tuple(int)):           the shape of the array read from.
+            gap(int):                    the number of unused elements that
+                                         may be read to merge two reads.
+
+        Returns:
+            (list, list):                the bounding slices of each read
+                                         and the read index and local
+                                         slicing for each selection.
+
+        Examples:
+
+            >>> reads, scatter = plan_reads(
+            ...     [(slice(0, 2), 3), (slice(0, 2), 4), (slice(7, 9), 0)],
+            ...     (10, 10)
+            ... )
+            >>> reads  #doctest: +NORMALIZE_WHITESPACE
+            [(slice(0, 2, 1), slice(3, 5, 1)),
+             (slice(7, 9, 1), slice(0, 1, 1))]
+            >>> scatter  #doctest: +NORMALIZE_WHITESPACE
+            [(0, (slice(0, 2, 1), 0)),
+             (0, (slice(0, 2, 1), 1)),
+             (1, (slice(0, 2, 1), 0))]
+
+            >>> reads, scatter = plan_reads(
+            ...     [(slice(0, 2), 3), (2, slice(3, 5)), (slice(7, 9), 0)],
+            ...     (10, 10),
+            ...     gap=40
+            ... )
+            >>> reads
+            [(slice(0, 9, 1), slice(0, 5, 1))]
+            >>> scatter  #doctest: +NORMALIZE_WHITESPACE
+            [(0, (slice(0, 2, 1), 3)),
+             (0, (2, slice(3, 5, 1))),
+             (0, (slice(7, 9, 1), 0))]
+    """
+
+    if not (isinstance(gap, numbers.Integral) and gap >= 0):
+        raise ValueError(
+            "The `gap` must be positive semidefinite. Instead got: %s." %
+            str(gap)
+        )
+
+    selections = [
+        kenjutsu.format.reformat_slices(each_selection, shape)
+        for each_selection in selections
+    ]
+
+    # Each read is a box and the selections it contains.
+    reads = []
+    for i, each_selection in enumerate(selections):
+        each_box = _selection_box(each_selection)
+        if each_box is not None:
+            reads.append((each_box, [i]))
+
+    # Keep merging reads until no pair can be merged within the gap.
+    # Reads are swept in order along the first axis. Merging reads further
+    # apart than the gap along it reads more than the gap. So each read is
+    # only compared to the earlier reads that still reach it.
+    merged = True
+    while merged:
+        merged = False
+        reads.sort(key=operator.itemgetter(0))
+
+        swept = []
+        active = []
+        for each_box, each_members in reads:
+            each_lo = _box_first_bounds(each_box)[0]
+            active = [
+                i for i in active
+                if _box_first_bounds(swept[i][0])[1] + gap >= each_lo
+            ]
+
+            for i in active:
+                box_i, members_i = swept[i]
+                if (_box_volume(_box_intersect(box_i, each_box)) or
+                        _merge_cost(box_i, each_box) <= gap):
+                    swept[i] = (
+                        _box_cover(box_i, each_box), members_i + each_members
+                    )
+                    merged = True
+                    break
+            else:
+                active.append(len(swept))
+                swept.append((each_box, each_members))
+
+        reads = swept
+
+    reads.sort(key=operator.itemgetter(0))
+
+    scatter = len(selections) * [(None, None)]
+    for i, (each_box, each_members) in enumerate(reads):
+        for each_member in each_members:
+            scatter[each_member] = (
+                i, _shift_slices(selections[each_member], each_box)
+            )
+
+    reads = [
+        tuple(slice(lo, hi, 1) for lo, hi in each_box)
+        for each_box, each_members in reads
+    ]
+
+    return reads, scatter
@@ -0,0 +1,289 @@
+from __future__ import absolute_import
+
+__author__ = "John Kirkham <kirkhamj@janelia.hhmi.org>"
+__date__ = "$Oct 18, 2026 00:59:03 GMT+0000$"
+
+
+import io
+import numbers
+import os
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+import kenjutsu.measure
+import kenjutsu.operators
+
+
+_preadv = getattr(os, "preadv", None)
+
+
+def _iov_max():
+    """
+        Determines the most buffers a single ``preadv`` call may fill.
+    """
+
+    try:
+        iov_max = os.sysconf("SC_IOV_MAX")
+    except (AttributeError, ValueError, OSError):
+        iov_max = -1
+
+    if iov_max <= 0:
+        iov_max = 1024
+
+    return iov_max
+
+
+def _plan_batches(offsets, nbytes, gap, max_buffers):
+    """
+        Groups runs into batches that can each be read with one call.
+
+        Runs are grouped as long as the space between them is no more than
+        ``gap`` bytes and the batch needs no more than ``max_buffers``
+        buffers. Each batch is a file offset and a list of buffer sizes.
+        Positive sizes are read into the result and negative ones are
+        skipped.
+    """
+
+    batches = []
+    batch_start = None
+    batch_end = None
+    batch_buffers = []
+    for each_offset, each_nbytes in zip(offsets.tolist(), nbytes.tolist()):
+        each_gap = None
+        if batch_end is not None:
+            each_gap = each_offset - batch_end
+
+        if (each_gap is not None and
+                0 <= each_gap <= gap and
+                len(batch_buffers) + (2 if each_gap else 1) <= max_buffers):
+            if each_gap:
+                batch_buffers.append(-each_gap)
+            batch_buffers.append(each_nbytes)
+        else:
+            if batch_buffers:
+                batches.append((batch_start, batch_buffers))
+
+            batch_start = each_offset
+            batch_buffers = [each_nbytes]
+
+        batch_end = each_offset + each_nbytes
+
+    if batch_buffers:
+        batches.append((batch_start, batch_buffers))
+
+    return batches
+
+
+def _read_batch(fd, fileobj, offset, buffers):
+    """
+        Reads a contiguous span of the file into a list of buffers.
+
+        Uses ``os.preadv`` if there is a file descriptor (``fd``).
+        Otherwise seeks and reads into each buffer in turn.
+    """
+
+    expected = sum(len(e) for e in buffers)
+
+    if fd is not None:
+        total = 0
+        while buffers:
+            n = _preadv(fd, buffers, offset + total)
+            if n == 0:
+                break
+            total += n
+
+            # Skip past any buffers filled by a short read.
+            while buffers and n >= len(buffers[0]):
+                n -= len(buffers[0])
+                buffers = buffers[1:]
+            if buffers:
+                buffers[0] = buffers[0][n:]
+    else:
+        total = 0
+        fileobj.seek(offset)
+        for each_buffer in buffers:
+            while len(each_buffer):
+                n = fileobj.readinto(each_buffer)
+                if not n:
+                    break
+                total += n
+                each_buffer = each_buffer[n:]
+            if len(each_buffer):
+                break
+
+    if total < expected:
+        raise EOFError(
+            "Reached the end of the file. Expected %i more bytes." %
+            (expected - total)
+        )
+
+
+def read_raw(fileobj, slices, shape, dtype, order="C", offset=0, gap=0):
+    """
+        Reads a selection from a raw binary array stored in a file.
+
+        Takes a file containing an array with ``shape`` and ``dtype``
+        stored in ``order`` starting at byte ``offset``. Finds the
+        contiguous runs of the file the selection needs (see
+        ``contiguous_runs``) and reads them straight into the result
+        without any intermediate copies. Runs separated by no more than
+        ``gap`` bytes are read with a single call, discarding the bytes
+        in between. So a larger ``gap`` trades reading unused bytes for
+        fewer calls. Where available and the file has a descriptor,
+        ``os.preadv`` is used to fill many runs with each call. Otherwise
+        each run is read after seeking to it.
+
+        Note:
+            Negative steps and decreasing sequences are read forward and
+            the result is flipped (see ``forward_slices``). So the result
+            may be a reversed view. Sequences are outer indexed (see
+            ``reformat_slices``).
+
+        Args:
+            fileobj(file):               a path or file opened in binary.
+            slices(tuple(slice)):        a tuple of slices to read.
+            shape(tuple(int)):           the shape of the array stored.
+            dtype(numpy.dtype):          the type of the array stored.
+            order(str):                  memory layout (``"C"`` or ``"F"``).
+            offset(int):                 byte offset where the array starts.
+            gap(int):                    bytes that may be discarded to
+                                         combine two reads.
+
+        Returns:
+            (numpy.ndarray):             the selection read.
+
+        Examples:
+
+            >>> import tempfile
+            >>> a = numpy.arange(24, dtype=numpy.int16).reshape(4, 6)
+            >>> with tempfile.NamedTemporaryFile() as f:
+            ...     a.tofile(f.name)
+            ...     read_raw(f.name, (slice(1, 3), [4, 2]), a.shape, a.dtype)
+            array([[10,  8],
+                   [16, 14]], dtype=int16)
+    """
+
+    if not (isinstance(gap, numbers.Integral) and gap >= 0):
+        raise ValueError(
+            "The `gap` must be positive semidefinite. Instead got: %s." %
+            str(gap)
+        )
+
+    dtype = numpy.dtype(dtype)
+    if dtype.hasobject:
+        raise ValueError(
+            "Cannot read arrays containing Python objects."
+            " Instead got `%s`." % str(dtype)
+        )
+
+    slices, flips = kenjutsu.operators.forward_slices(slices, shape)
+    offsets, nbytes = kenjutsu.measure.contiguous_runs(
+        slices, shape, dtype.itemsize, order
+    )
+
+    result = numpy.empty(
+        kenjutsu.measure.selection_shape(slices, shape), dtype, order=order
+    )
+    result_bytes = memoryview(
+        result.reshape(-1, order=order).view(numpy.uint8)
+    )
+
+    close = False
+    if isinstance(fileobj, (str, bytes)):
+        fileobj = io.open(fileobj, "rb", buffering=0)
+        close = True
+
+    try:
+        fd = None
+        if _preadv is not None:
+            try:
+                fd = fileobj.fileno()
+            except (AttributeError, OSError, ValueError):
+                pass
+
+        batches = _plan_batches(offsets + offset, nbytes, gap, _iov_max())
+
+        # Only keep space for the largest span skipped.
+        discard = max(
+            [-e for each_offset, each_sizes in batches
+             for e in each_sizes if e < 0] or [0]
+        )
+        if discard:
+            discard = memoryview(bytearray(discard))
+
+        position = 0
+        for each_offset, each_sizes in batches:
+            each_buffers = []
+            for each_size in each_sizes:
+                if each_size < 0:
+                    each_buffers.append(discard[:-each_size])
+                else:
+                    each_buffers.append(
+                        result_bytes[position:position + each_size]
+                    )
+                    position += each_size
+
+            _read_batch(fd, fileobj, each_offset, each_buffers)
+    finally:
+        if close:
+            fileobj.close()
+
+    return result[tuple(
+        slice(None, None, -1) if each_flip else slice(None)
+        for each_flip in flips
+    )]
+
+
+def read_npy(fileobj, slices, gap=0):
+    """
+        Reads a selection from an array stored in a ``.npy`` file.
+
+        Reads the header to find the shape, type, and order of the array
+        stored. Then reads the selection with ``read_raw`` (see it for
+        more details).
+
+        Args:
+            fileobj(file):               a path or file opened in binary.
+            slices(tuple(slice)):        a tuple of slices to read.
+            gap(int):                    bytes that may be discarded to
+                                         combine two reads.
+
+        Returns:
+            (numpy.ndarray):             the selection read.
+
+        Examples:
+
+            >>> import tempfile
+            >>> a = numpy.arange(24, dtype=numpy.int16).reshape(4, 6)
+            >>> with tempfile.NamedTemporaryFile(suffix=".npy") as f:
+            ...     numpy.save(f.name, a)
+            ...     read_npy(f.name, (-1, slice(None, None, -2)))
+            array([23, 21, 19], dtype=int16)
+    """
+
+    close = False
+    if isinstance(fileobj, (str, bytes)):
+        fileobj = io.open(fileobj, "rb", buffering=0)
+        close = True
+
+    try:
+        version = numpy.lib.format.read_magic(fileobj)
+        if version == (1, 0):
+            header = numpy.lib.format.read_array_header_1_0(fileobj)
+        else:
+            header = numpy.lib.format.read_array_header_2_0(fileobj)
+        shape, fortran_order, dtype = header
+        offset = fileobj.tell()
+
+        return read_raw(
+            fileobj, slices, shape, dtype,
+            order="F" if fortran_order else "C",
+            offset=offset,
+            gap=gap
+        )
+    finally:
+        if close:
+            fileobj.close()
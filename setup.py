@@ -13,11 +13,11 @@ with open("HISTORY.rst") as history_file:
     history = history_file.read()
 
 requirements = [
-    # TODO: put package requirements here
+    "futures; python_version < '3.0'",
 ]
 
 test_requirements = [
-    # TODO: put package test requirements here
+    "numpy",
 ]
 
 
@@ -3,10 +3,14 @@ __date__ = "$Dec 08, 2016 15:26:16 GMT-0500$"
 
 
 import doctest
+import itertools
 import sys
 import unittest
 
+import numpy
+
 from kenjutsu import blocks
+from kenjutsu import format
 
 
 try:
@@ -399,6 +403,357 @@ class TestBlocks(unittest.TestCase):
         )
 
 
+    def test_block_grid(self):
+        with self.assertRaises(ValueError) as e:
+            blocks.BlockGrid((1,), (1, 2), (1, 2, 3))
+
+        self.assertEqual(
+            str(e.exception),
+            "The dimensions of `space_shape`, `block_shape`, and `block_halo`"
+            " should be the same."
+        )
+
+        with self.assertRaises(ValueError) as e:
+            blocks.BlockGrid((1, 2), (1, 1), (0, -1))
+
+        self.assertEqual(
+            str(e.exception),
+            "Shape of the halo must all be positive semidefinite."
+            "Instead got: (0, -1)."
+        )
+
+        grid = blocks.BlockGrid((2,), (-1,))
+        self.assertEqual(grid.block_shape, (2,))
+        self.assertEqual(grid.shape, (1,))
+        self.assertEqual(len(grid), 1)
+
+        for space_shape, block_shape, block_halo in [
+                ((2,), (1,), None),
+                ((2, 3,), (1, 1,), (1, 1,)),
+                ((10, 12,), (3, 2,), (4, 3,)),
+                ((7, 5, 6,), (2, 5, 4,), (1, 0, 2,))]:
+            grid = blocks.BlockGrid(space_shape, block_shape, block_halo)
+            expected = blocks.split_blocks(
+                space_shape, block_shape, block_halo, True
+            )
+            expected = list(zip(*expected))
+
+            self.assertEqual(len(grid), len(expected))
+            self.assertEqual(list(grid), expected)
+
+            for i in irange(-len(expected), len(expected)):
+                self.assertEqual(grid[i], expected[i])
+                self.assertEqual(grid[expected[i][0]], expected[i])
+
+            for each_slice in [slice(None), slice(1, None, 2),
+                               slice(None, None, -3), slice(-2, 1, -1),
+                               slice(5, 2)]:
+                sub_grid = grid[each_slice]
+                self.assertEqual(len(sub_grid), len(expected[each_slice]))
+                self.assertEqual(list(sub_grid), expected[each_slice])
+                self.assertEqual(
+                    list(sub_grid[1::2]), expected[each_slice][1::2]
+                )
+
+            with self.assertRaises(IndexError):
+                grid[len(expected)]
+
+            with self.assertRaises(IndexError):
+                grid[-len(expected) - 1]
+
+            with self.assertRaises(IndexError):
+                grid[grid.shape[:-1] + (grid.shape[-1],)]
+
+            with self.assertRaises(IndexError):
+                grid[grid.shape + (0,)]
+
+            with self.assertRaises(TypeError):
+                grid[1.5]
+
+
+    def test_block_grid_order(self):
+        with self.assertRaises(ValueError) as e:
+            blocks.BlockGrid((4, 4), (1, 1), order="A")
+
+        self.assertEqual(
+            str(e.exception),
+            "The `order` must be one of C, F, morton, hilbert."
+            " Instead got: A."
+        )
+
+        grid = blocks.BlockGrid((4, 4), (1, 1), order="morton")
+        self.assertEqual(
+            [e.index for e in grid[:8]],
+            [(0, 0), (0, 1), (1, 0), (1, 1), (0, 2), (0, 3), (1, 2), (1, 3)]
+        )
+
+        grid = blocks.BlockGrid((8, 8, 8), (1, 1, 1), order="hilbert")
+        indices = [e.index for e in grid]
+        for each_prev, each_next in zip(indices[:-1], indices[1:]):
+            self.assertEqual(
+                sum(abs(i - j) for i, j in zip(each_prev, each_next)), 1
+            )
+
+        # Only the parts of the curve in the grid are visited.
+        grid = blocks.BlockGrid((1024, 2), (1, 1), order="hilbert")
+        indices = [e.index for e in grid]
+        self.assertEqual(len(indices), 2048)
+        self.assertEqual(sorted(indices), [e.index for e in blocks.BlockGrid(
+            (1024, 2), (1, 1)
+        )])
+        self.assertEqual(grid[1000].index, indices[1000])
+
+        grid = blocks.BlockGrid((100, 100, 50), (1, 1, 1), order="morton")
+        self.assertEqual(
+            [grid[i].index for i in irange(6)],
+            [e.index for e in itertools.islice(grid, 6)]
+        )
+        self.assertEqual(grid[-1].index, (99, 99, 49))
+
+        grid = blocks.BlockGrid((3, 4), (1, 1), order="F")
+        self.assertEqual(
+            [e.index for e in grid],
+            [(i, j) for j in irange(4) for i in irange(3)]
+        )
+
+        for space_shape, block_shape, block_halo in [
+                ((2,), (1,), None),
+                ((10, 12,), (3, 2,), (4, 3,)),
+                ((7, 5, 6,), (2, 5, 4,), (1, 0, 2,)),
+                ((30, 3,), (1, 1,), (1, 1,))]:
+            expected = list(
+                blocks.BlockGrid(space_shape, block_shape, block_halo)
+            )
+
+            for order in blocks.BlockGrid.orders:
+                grid = blocks.BlockGrid(
+                    space_shape, block_shape, block_halo, order
+                )
+                result = list(grid)
+
+                self.assertEqual(len(result), len(grid))
+                self.assertEqual(sorted(result), expected)
+                self.assertEqual(
+                    list(grid[1::2]), result[1::2]
+                )
+
+                grid = blocks.BlockGrid(
+                    space_shape, block_shape, block_halo, order
+                )
+                sub_grid = grid[::-2]
+                self.assertEqual(list(sub_grid), result[::-2])
+                self.assertEqual(
+                    [grid[i] for i in irange(len(grid))], result
+                )
+                self.assertEqual(list(sub_grid), result[::-2])
+
+                self.assertEqual(
+                    list(zip(*blocks.split_blocks(
+                        space_shape, block_shape, block_halo, True, order
+                    ))),
+                    result
+                )
+
+
+    def test_block_grid_locate(self):
+        grid = blocks.BlockGrid((4, 5), (2, 2))
+
+        with self.assertRaises(ValueError) as e:
+            grid.locate([0, 1])
+
+        self.assertEqual(
+            str(e.exception),
+            "Expected points with shape `(n, 2)`. Instead got `(2,)`."
+        )
+
+        with self.assertRaises(TypeError):
+            grid.locate([[0.5, 1]])
+
+        with self.assertRaises(IndexError):
+            grid.locate([[0, 5]])
+
+        with self.assertRaises(IndexError):
+            grid.locate_haloed([[-1, 0]])
+
+        for space_shape, block_shape, block_halo in [
+                ((2,), (1,), None),
+                ((10, 12,), (3, 2,), (4, 3,)),
+                ((7, 5, 6,), (2, 5, 4,), (1, 0, 2,))]:
+            grid = blocks.BlockGrid(space_shape, block_shape, block_halo)
+            grid_blocks = list(grid)
+
+            points = numpy.array(list(itertools.product(*[
+                range(n) for n in space_shape
+            ])))
+            points = points[numpy.random.RandomState(0).permutation(
+                len(points)
+            )]
+
+            index, offset = grid.locate(points)
+            for each_point, each_index, each_offset in zip(
+                    points.tolist(), index.tolist(), offset.tolist()):
+                each_block = grid[tuple(each_index)]
+                self.assertEqual(
+                    [e.start + o for e, o in zip(each_block.core,
+                                                 each_offset)],
+                    each_point
+                )
+                self.assertTrue(all(
+                    0 <= o < e.stop - e.start
+                    for e, o in zip(each_block.core, each_offset)
+                ))
+
+            point_ids, index, offset = grid.locate_haloed(points)
+            expected = []
+            for i, each_point in enumerate(points.tolist()):
+                for each_block in grid_blocks:
+                    each_offset = [
+                        p - e.start for p, e in zip(each_point,
+                                                    each_block.haloed)
+                    ]
+                    if all(0 <= o < e.stop - e.start for o, e in zip(
+                            each_offset, each_block.haloed)):
+                        expected.append(
+                            (i, list(each_block.index), each_offset)
+                        )
+
+            self.assertEqual(
+                list(zip(point_ids.tolist(), index.tolist(), offset.tolist())),
+                expected
+            )
+
+
+    def test_block_grid_query(self):
+        grid = blocks.BlockGrid((4, 5), (2, 2))
+
+        with self.assertRaises(ValueError) as e:
+            grid.query((slice(None, None, 2),))
+
+        self.assertEqual(
+            str(e.exception),
+            "Only contiguous regions of interest are supported."
+            " Instead got `slice(0, 4, 2)`."
+        )
+
+        with self.assertRaises(ValueError):
+            grid.query(([0, 1],))
+
+        self.assertEqual(list(grid.query((slice(2, 2),))), [])
+
+        grid = blocks.BlockGrid(3 * (10**12,), 3 * (10,))
+        self.assertEqual(
+            [e.block.index for e in grid.query(3 * (slice(15, 21),))],
+            list(itertools.product(*(3 * [(1, 2)])))
+        )
+
+        for space_shape, block_shape, block_halo, rois in [
+                ((10, 12,), (3, 2,), (4, 3,),
+                 [Ellipsis, (slice(1, 6), slice(2, 3)), (3, slice(4, None)),
+                  (slice(-3, None), -1), (slice(5, 6), slice(3, 2, -1)),
+                  (slice(5, 2, -1),),
+                  (slice(None, None, -1), slice(8, None, -1)),
+                  (slice(2, 7), slice(11, 0, -1))]),
+                ((7, 5, 6,), (2, 5, 4,), (1, 0, 2,),
+                 [Ellipsis, (slice(-3, None), -1, slice(0, 1, -1)),
+                  (slice(1, 6), 2, slice(3, None)),
+                  (slice(None, None, -1), 2, slice(5, 0, -1))])]:
+            grid = blocks.BlockGrid(space_shape, block_shape, block_halo)
+            a = numpy.arange(numpy.prod(space_shape)).reshape(space_shape)
+
+            for each_roi in rois:
+                mask = numpy.zeros(space_shape, dtype=bool)
+                mask[each_roi] = True
+                expected = [e for e in grid if mask[e.core].any()]
+
+                result = numpy.empty_like(a[each_roi])
+                result[...] = -1
+                overlaps = list(grid.query(each_roi))
+                self.assertEqual([e.block for e in overlaps], expected)
+                for each_overlap in overlaps:
+                    each_haloed = a[each_overlap.block.haloed]
+                    self.assertTrue(numpy.array_equal(
+                        each_haloed[each_overlap.local],
+                        a[each_overlap.space]
+                    ))
+                    result[each_overlap.roi] = each_haloed[each_overlap.local]
+
+                self.assertTrue(numpy.array_equal(result, a[each_roi]))
+
+
+    def test_split_chunks(self):
+        with self.assertRaises(ValueError) as e:
+            blocks.split_chunks((slice(None),), (4,), (2, 2))
+
+        self.assertEqual(
+            str(e.exception),
+            "The dimensions of `space_shape` and `chunk_shape` should be"
+            " the same."
+        )
+
+        with self.assertRaises(ValueError) as e:
+            blocks.split_chunks((slice(None),), (4,), (0,))
+
+        self.assertEqual(
+            str(e.exception),
+            "Shape of the chunks must all be positive definite."
+            "Instead got: (0,)."
+        )
+
+        self.assertEqual(
+            blocks.split_chunks((slice(3, 3),), (10,), (3,)),
+            []
+        )
+
+        space_shape = (10, 11)
+        chunk_shape = (3, 4)
+        a = numpy.arange(numpy.prod(space_shape)).reshape(space_shape)
+
+        dim_indices = [
+            slice(None), slice(1, 7), slice(2, None, 5), slice(None, None, -1),
+            slice(8, 0, -3), 5, -1, [7, 1, 2, 2, 9], [0, 1, 2]
+        ]
+
+        def outer(slices, shape):
+            # Applies each index independently of the others.
+            return numpy.ix_(*[
+                numpy.arange(n)[e] if isinstance(e, slice) else e
+                for e, n in zip(slices, shape)
+            ])
+
+        for each_slices in itertools.product(dim_indices, dim_indices):
+            if sum(isinstance(e, list) for e in each_slices) > 1:
+                expected = a[outer(each_slices, space_shape)]
+            else:
+                expected = a[each_slices]
+
+            result = numpy.empty_like(expected)
+            touched = set()
+            for each_chunk_index, each_chunk_slices, each_out in \
+                    blocks.split_chunks(each_slices, space_shape, chunk_shape):
+                self.assertNotIn(each_chunk_index, touched)
+                touched.add(each_chunk_index)
+
+                each_chunk = a[tuple(
+                    slice(i * c, (i + 1) * c)
+                    for i, c in zip(each_chunk_index, chunk_shape)
+                )]
+                if sum(isinstance(e, list) for e in each_chunk_slices) > 1:
+                    result[outer(each_out, result.shape)] = each_chunk[
+                        outer(each_chunk_slices, each_chunk.shape)
+                    ]
+                else:
+                    result[each_out] = each_chunk[each_chunk_slices]
+
+            self.assertTrue(numpy.array_equal(result, expected))
+
+        self.assertEqual(
+            blocks.split_chunks(
+                (format.NormalizedSlice(slice(2, 5), 10),), (10,), (3,)
+            ),
+            blocks.split_chunks((slice(2, 5),), (10,), (3,))
+        )
+
+
     def tearDown(self):
         pass
 
@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+
+# -*- coding: utf-8 -*-
+
+__author__ = "John Kirkham <kirkhamj@janelia.hhmi.org>"
+__date__ = "$Oct 18, 2026 00:35:44 GMT+0000$"
+
+
+import doctest
+import sys
+import timeit
+import unittest
+
+from kenjutsu import cache
+from kenjutsu import format
+from kenjutsu import measure
+
+
+try:
+    irange = xrange
+except NameError:
+    irange = range
+
+
+# Load doctests from `cache`.
+def load_tests(loader, tests, ignore):
+    tests.addTests(doctest.DocTestSuite(cache))
+    return tests
+
+
+class TestCache(unittest.TestCase):
+    def setUp(self):
+        pass
+
+
+    def test_slice_cache(self):
+        with self.assertRaises(ValueError) as e:
+            cache.SliceCache(-1)
+
+        self.assertEqual(
+            str(e.exception),
+            "The `maxsize` must be positive semidefinite or `None`."
+            " Instead got: -1."
+        )
+
+        a_cache = cache.SliceCache(3)
+
+        for each_slices, each_lengths in [
+                ((slice(None), 3), (10, 5)),
+                ((Ellipsis, slice(2, None, -1)), (10, 5, 6)),
+                ((slice(None), [0, -1, 2]), (10, 5)),
+                (slice(3, None), 10),
+                (tuple(), (4,)),
+                (Ellipsis, (3, 4))]:
+            for i in irange(2):
+                self.assertEqual(
+                    a_cache.reformat_slices(each_slices, each_lengths),
+                    format.reformat_slices(each_slices, each_lengths)
+                )
+                self.assertEqual(
+                    a_cache.len_slices(each_slices, each_lengths),
+                    measure.len_slices(each_slices, each_lengths)
+                )
+
+        self.assertEqual(a_cache.hits, 12)
+        self.assertEqual(a_cache.misses, 12)
+        self.assertEqual(a_cache.evictions, 9)
+        self.assertEqual(len(a_cache), 3)
+
+        # Cached sequences cannot be changed by the caller.
+        result = a_cache.reformat_slices((slice(None), [0, -1, 2]), (10, 5))
+        result[1].append(0)
+        self.assertEqual(
+            a_cache.reformat_slices((slice(None), [0, -1, 2]), (10, 5)),
+            (slice(0, 10, 1), [0, 4, 2])
+        )
+
+        # Similar values of different types are kept apart.
+        self.assertEqual(
+            a_cache.reformat_slices((1, slice(None)), (2, 3)),
+            (1, slice(0, 3, 1))
+        )
+        with self.assertRaises(TypeError):
+            a_cache.reformat_slices((1.0, slice(None)), (2, 3))
+        self.assertEqual(
+            a_cache.reformat_slices(([1], slice(None)), (2, 3)),
+            ([1], slice(0, 3, 1))
+        )
+
+        # Ranges are cached without going through each index.
+        self.assertEqual(
+            a_cache.reformat_slices((range(0, 10**8, 3),), (10**8,)),
+            (slice(0, 10**8, 3),)
+        )
+        self.assertEqual(
+            a_cache.reformat_slices((range(0, 10**8, 6),), (10**8,)),
+            (slice(0, 10**8, 6),)
+        )
+        self.assertEqual(
+            a_cache.reformat_slices((range(0, 10**8, 6),), (10**8,)),
+            (slice(0, 10**8, 6),)
+        )
+
+        # Errors are not cached.
+        for i in irange(2):
+            with self.assertRaises(IndexError):
+                a_cache.reformat_slices((5,), (2,))
+
+        a_cache.clear()
+        self.assertEqual(len(a_cache), 0)
+        self.assertEqual(a_cache.hits, 0)
+        self.assertEqual(a_cache.misses, 0)
+        self.assertEqual(a_cache.evictions, 0)
+
+        a_cache = cache.SliceCache(0)
+        for i in irange(2):
+            self.assertEqual(
+                a_cache.reformat_slices(slice(None), 5),
+                (slice(0, 5, 1),)
+            )
+        self.assertEqual(len(a_cache), 0)
+        self.assertEqual(a_cache.hits, 0)
+        self.assertEqual(a_cache.misses, 2)
+
+        a_cache = cache.SliceCache(None)
+        for i in irange(200):
+            a_cache.len_slices(slice(i), 500)
+        self.assertEqual(len(a_cache), 200)
+        self.assertEqual(a_cache.evictions, 0)
+
+
+    def test_slice_cache_hits(self):
+        # Looking up a result costs less than computing it.
+        a_cache = cache.SliceCache()
+        slices = (slice(None), slice(2, None, -1), 3, slice(1, 4))
+        lengths = (10, 5, 6, 7)
+
+        for func, cached_func in [
+                (format.reformat_slices, a_cache.reformat_slices),
+                (measure.len_slices, a_cache.len_slices)]:
+            cached_func(slices, lengths)
+
+            uncached = min(timeit.repeat(
+                lambda: func(slices, lengths), number=2000, repeat=3
+            ))
+            cached = min(timeit.repeat(
+                lambda: cached_func(slices, lengths), number=2000, repeat=3
+            ))
+            self.assertLess(cached, uncached)
+
+        self.assertEqual(a_cache.misses, 2)
+
+
+    def tearDown(self):
+        pass
+
+
+
+if __name__ == '__main__':
+    sys.exit(unittest.main())
@@ -7,9 +7,12 @@ __date__ = "$Dec 08, 2016 11:35:58 GMT-0500$"
 
 
 import doctest
+import pickle
 import sys
 import unittest
 
+import numpy
+
 from kenjutsu import core
 
 
@@ -30,6 +33,82 @@ class TestCore(unittest.TestCase):
         pass
 
 
+    def test_selection(self):
+        with self.assertRaises(IndexError):
+            core.Selection((3, [0, 7]), (5, 6))
+
+        with self.assertRaises(ValueError):
+            core.Selection((3, 4, 5), (5, 6))
+
+        shape = (7, 5, 6)
+        a = numpy.arange(numpy.prod(shape)).reshape(shape)
+
+        for each_slices in [Ellipsis,
+                            (slice(None, None, 2), 3, [4, 0]),
+                            (slice(None, None, -3), Ellipsis, -1),
+                            (slice(2, 2), slice(None), 0),
+                            (1, [], slice(1, None, 4)),
+                            (-1, numpy.array([3, 1, -1, 1]), slice(5, 2, -1)),
+                            (slice(4, None, -2), range(3, 0, -1)),
+                            (3, slice(None), [4, 0]),
+                            ([6, 0], slice(1, 4), [4, 0, 4]),
+                            ([2], 1, numpy.array([], dtype=int))]:
+            sel = core.Selection(each_slices, shape)
+            result = a[sel.ix]
+            expected = a[numpy.ix_(*[
+                numpy.arange(n)[e] if isinstance(e, slice) else
+                numpy.array(e, dtype=int, ndmin=1)
+                for e, n in zip(sel, shape)
+            ])].reshape(sel.shape)
+
+            self.assertIsInstance(sel, tuple)
+            self.assertEqual(sel.space_shape, shape)
+            self.assertEqual(sel.shape, result.shape)
+            self.assertEqual(sel.size, expected.size)
+            self.assertEqual(result.tolist(), expected.tolist())
+
+            coords = numpy.unravel_index(expected.ravel(), shape)
+            if expected.size:
+                for each_bbox, each_coords in zip(sel.bbox, coords):
+                    self.assertEqual(
+                        each_bbox,
+                        slice(each_coords.min(), each_coords.max() + 1, 1)
+                    )
+            else:
+                self.assertIn(slice(0, 0, 1), sel.bbox)
+
+            other = core.Selection(sel, shape)
+            self.assertEqual(sel, other)
+            self.assertFalse(sel != other)
+            self.assertEqual(hash(sel), hash(other))
+
+            other = pickle.loads(pickle.dumps(sel))
+            self.assertIsInstance(other, core.Selection)
+            self.assertEqual(sel, other)
+            self.assertEqual(sel.shape, other.shape)
+            self.assertEqual(sel.bbox, other.bbox)
+
+        self.assertNotEqual(
+            core.Selection((slice(None), 1), (5, 6)),
+            core.Selection((slice(None), 1), (6, 6))
+        )
+        self.assertNotEqual(
+            core.Selection((slice(None), 1), (5, 6)),
+            core.Selection((slice(None), 2), (5, 6))
+        )
+        self.assertNotEqual(
+            core.Selection((slice(None), [1]), (5, 6)),
+            core.Selection((slice(None), 1), (5, 6))
+        )
+
+        sels = {
+            core.Selection((slice(None), -1), (5, 6)),
+            core.Selection((slice(0, 5), 5), (5, 6)),
+            core.Selection((slice(None, None, -1), -1), (5, 6)),
+        }
+        self.assertEqual(len(sels), 2)
+
+
     def tearDown(self):
         pass
 
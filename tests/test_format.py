@@ -8,6 +8,8 @@ import math
 import operator
 import unittest
 
+import numpy
+
 from kenjutsu import format
 
 
@@ -301,14 +303,9 @@ class TestFormat(unittest.TestCase):
             "Only one Ellipsis is permitted. Found multiple."
         )
 
-        with self.assertRaises(ValueError) as e:
-            format.reformat_slices(
-                ([0, 1], [0, 1]),
-            )
-
         self.assertEqual(
-            str(e.exception),
-            "Only one integral sequence supported. Instead got `2`."
+            format.reformat_slices(([0, -1], [1, 0]), (3, 4)),
+            ([0, 2], [1, 0])
         )
 
         rf_slice = format.reformat_slices(slice(None))
@@ -500,14 +497,17 @@ class TestFormat(unittest.TestCase):
 
 
     def test_split_indices(self):
-        with self.assertRaises(ValueError) as e:
-            format.split_indices(
-                ([0, 1], [0, 1]),
-            )
-
+        sp_slice = format.split_indices(
+            ([0, 1], slice(None), [2, 0])
+        )
         self.assertEqual(
-            str(e.exception),
-            "Only one integral sequence supported. Instead got `2`."
+            sp_slice,
+            [
+                (slice(0, 1, 1), slice(0, None, 1), slice(2, 3, 1)),
+                (slice(0, 1, 1), slice(0, None, 1), slice(0, 1, 1)),
+                (slice(1, 2, 1), slice(0, None, 1), slice(2, 3, 1)),
+                (slice(1, 2, 1), slice(0, None, 1), slice(0, 1, 1))
+            ]
         )
 
         sp_slice = format.split_indices(
@@ -564,3 +564,565 @@ class TestFormat(unittest.TestCase):
                 (3, Ellipsis, slice(2, 3, 1), slice(2, 5, 1), -1)
             ]
         )
+
+
+    def test_unique_indices(self):
+        self.assertEqual(
+            format.unique_indices((Ellipsis, [3, -1, 0, -1, 3])),
+            ((Ellipsis, [0, 3, -1]), (Ellipsis, [1, 2, 0, 2, 1]))
+        )
+
+        self.assertEqual(
+            format.unique_indices(([], 1), (3, 4)),
+            (([], 1), ([],))
+        )
+
+        shape = (6, 7, 8)
+        a = numpy.arange(numpy.prod(shape)).reshape(shape)
+        for each_slices in [
+                (slice(None), [6, 1, 1, 0, -1], 2),
+                ([5, 5, 5], slice(None, None, -2), [0, 7, 3, 7]),
+                (numpy.array([4, -1, 0, 4]), 0, numpy.array([2, 2])),
+                (1, [3, 4, 5], slice(2, 4))]:
+            expected = a[numpy.ix_(*[
+                numpy.arange(n)[e] if isinstance(e, slice) else
+                numpy.array(e, dtype=int).reshape(-1)
+                for e, n in zip(each_slices, shape)
+            ])][tuple(
+                0 if isinstance(e, int) else slice(None) for e in each_slices
+            )]
+
+            unique_slices, inverses = format.unique_indices(
+                each_slices, shape
+            )
+            self.assertEqual(len(inverses), expected.ndim)
+            for each_slice in unique_slices:
+                if format.is_index_sequence(each_slice):
+                    self.assertTrue((numpy.diff(each_slice) > 0).all())
+
+            result = numpy.empty(
+                tuple(
+                    len(e) if format.is_index_sequence(e) else
+                    len(numpy.arange(n)[e])
+                    for e, n in zip(unique_slices, shape)
+                    if not isinstance(e, int)
+                ),
+                dtype=a.dtype
+            )
+            for each_read, each_position in format.isplit_indices(
+                    unique_slices, coalesce=True):
+                result[each_position] = a[each_read]
+
+            for i, each_inverse in enumerate(inverses):
+                if each_inverse is not None:
+                    result = result.take(each_inverse, axis=i)
+
+            self.assertTrue(numpy.array_equal(result, expected))
+
+
+    def test_isplit_indices(self):
+        self.assertEqual(
+            list(format.isplit_indices(([0, 1], [0, 1]))),
+            format.split_indices(([0, 1], [0, 1]))
+        )
+
+        sp_slice = format.isplit_indices(
+            (3, Ellipsis, [2, 0, 1, 2], slice(2, 5, 1), -1)
+        )
+        self.assertEqual(
+            next(sp_slice),
+            (3, Ellipsis, slice(2, 3, 1), slice(2, 5, 1), -1)
+        )
+        self.assertEqual(
+            list(sp_slice),
+            [
+                (3, Ellipsis, slice(0, 1, 1), slice(2, 5, 1), -1),
+                (3, Ellipsis, slice(1, 2, 1), slice(2, 5, 1), -1),
+                (3, Ellipsis, slice(2, 3, 1), slice(2, 5, 1), -1)
+            ]
+        )
+
+        for each_slices in [(3, Ellipsis, 0, slice(2, 5, 1), -1),
+                            (3, Ellipsis, [], slice(2, 5, 1), -1),
+                            (slice(None), [-1, 4, 2])]:
+            self.assertEqual(
+                list(format.isplit_indices(each_slices)),
+                format.split_indices(each_slices)
+            )
+
+
+    def test_num_split_indices(self):
+        self.assertEqual(
+            format.num_split_indices(([0, 1], [0, 1, 2], 4)),
+            6
+        )
+
+        self.assertEqual(
+            format.num_split_indices(
+                ([0, 1], [0, 1, 2], [4, 6]), coalesce=True
+            ),
+            1
+        )
+
+        for each_slices in [(3, Ellipsis, 0, slice(2, 5, 1), -1),
+                            (3, Ellipsis, [], slice(2, 5, 1), -1),
+                            (3, Ellipsis, [2, 0, 1, 2], slice(2, 5, 1), -1),
+                            (slice(None), [-1, 4, 2])]:
+            self.assertEqual(
+                format.num_split_indices(each_slices),
+                len(format.split_indices(each_slices))
+            )
+
+
+    def test_coalesce_indices(self):
+        self.assertEqual(format.coalesce_indices([]), [])
+
+        self.assertEqual(
+            format.coalesce_indices([4]),
+            [(slice(4, 5, 1), 1)]
+        )
+
+        self.assertEqual(
+            format.coalesce_indices([-4]),
+            [(slice(-4, -5, -1), 1)]
+        )
+
+        self.assertEqual(
+            format.coalesce_indices(list(irange(10000))),
+            [(slice(0, 10000, 1), 10000)]
+        )
+
+        self.assertEqual(
+            format.coalesce_indices([2, 1, 0, -3, -2, -1, -1, 4, 8, 9]),
+            [(slice(2, None, -1), 3),
+             (slice(-3, None, 1), 3),
+             (slice(-1, -2, -1), 1),
+             (slice(4, 12, 4), 2),
+             (slice(9, 10, 1), 1)]
+        )
+
+        for size in [10, 11, 12]:
+            each_range = list(irange(size))
+            for indices in [[0, 1, 2, 3, 7, 5, 3, 3, -1],
+                            [-1, 0, 1, 2, 9, 6, 3, 0, -2, -4],
+                            [5, 5, 5, 4, -10, -8, -6, -7, 1, 0]]:
+                result = []
+                for each_slice, each_len in format.coalesce_indices(indices):
+                    each_result = each_range[each_slice]
+                    self.assertEqual(len(each_result), each_len)
+                    result.extend(each_result)
+
+                self.assertEqual(result, [each_range[i] for i in indices])
+
+
+    def test_split_indices_coalesce(self):
+        sp_slice = format.split_indices(
+            (3, Ellipsis, 0, slice(2, 5, 1), -1),
+            coalesce=True
+        )
+        self.assertEqual(
+            sp_slice,
+            (
+                [(3, Ellipsis, 0, slice(2, 5, 1), -1)],
+                [(Ellipsis, slice(None))]
+            )
+        )
+
+        sp_slice = format.split_indices(
+            (3, Ellipsis, list(irange(10000)), slice(2, 5, 1), -1),
+            coalesce=True
+        )
+        self.assertEqual(
+            sp_slice,
+            (
+                [(3, Ellipsis, slice(0, 10000, 1), slice(2, 5, 1), -1)],
+                [(Ellipsis, slice(0, 10000, 1), slice(None))]
+            )
+        )
+
+        sp_slice = format.split_indices(
+            (3, [2, 0, 1, 2, 7, 7], slice(2, 5, 1)),
+            coalesce=True
+        )
+        self.assertEqual(
+            sp_slice,
+            (
+                [(3, slice(2, None, -2), slice(2, 5, 1)),
+                 (3, slice(1, 3, 1), slice(2, 5, 1)),
+                 (3, slice(7, 8, 1), slice(2, 5, 1)),
+                 (3, slice(7, 8, 1), slice(2, 5, 1))],
+                [(slice(0, 2, 1), slice(None)),
+                 (slice(2, 4, 1), slice(None)),
+                 (slice(4, 5, 1), slice(None)),
+                 (slice(5, 6, 1), slice(None))]
+            )
+        )
+
+        self.assertEqual(
+            format.split_indices((slice(None), []), coalesce=True),
+            ([], [])
+        )
+
+        a = numpy.arange(4 * 9 * 6).reshape(4, 9, 6)
+        for each_slices in [([3, 1, 2], [2, 0, 1, 2, 7, 7], slice(2, 5, 1)),
+                            ([0, 1], slice(1, None, 3), [5, 3, 1, 0]),
+                            ([], [1, 2], 3)]:
+            expected = a[numpy.ix_(*[
+                numpy.arange(n)[e] if isinstance(e, slice) else
+                numpy.array(e, dtype=int).reshape(-1)
+                for e, n in zip(each_slices, a.shape)
+            ])]
+            if isinstance(each_slices[-1], int):
+                expected = expected[..., 0]
+            result = numpy.empty_like(expected)
+            for each_read, each_position in format.isplit_indices(
+                    each_slices, coalesce=True):
+                result[each_position] = a[each_read]
+
+            self.assertTrue(numpy.array_equal(result, expected))
+
+        for each_slices in [(3, Ellipsis, 0, slice(2, 5, 1), -1),
+                            (3, [2, 0, 1, 2, 7, 7], slice(2, 5, 1)),
+                            ([3, 1, 2], [2, 0, 1, 2, 7, 7], slice(2, 5, 1)),
+                            (slice(None), []),
+                            (slice(None), [-1, 4, 2])]:
+            self.assertEqual(
+                list(zip(*format.split_indices(each_slices, coalesce=True))),
+                list(format.isplit_indices(each_slices, coalesce=True))
+            )
+            self.assertEqual(
+                format.num_split_indices(each_slices, coalesce=True),
+                len(format.split_indices(each_slices, coalesce=True)[0])
+            )
+
+
+    def test_reformat_slice_arrays(self):
+        with self.assertRaises(ValueError) as e:
+            format.reformat_slice_arrays([None], [None], [0])
+
+        self.assertEqual(
+            str(e.exception),
+            "Slice cannot have a step size of `0`."
+        )
+
+        for size in [None, 0, 1, 10, 11, 12]:
+            excess = (size or 10) + 3
+
+            starts = []
+            stops = []
+            steps = []
+            for start in itertools.chain([None], irange(-excess, excess)):
+                for stop in itertools.chain([None], irange(-excess, excess)):
+                    for step in itertools.chain(irange(-excess, excess)):
+                        step = None if step == 0 else step
+
+                        starts.append(start)
+                        stops.append(stop)
+                        steps.append(step)
+
+            rf_slices = format.reformat_slice_arrays(
+                numpy.array(starts, dtype=object),
+                numpy.array(stops, dtype=object),
+                numpy.array(steps, dtype=object),
+                size
+            )
+            rf_slices = zip(*[e.tolist() for e in rf_slices])
+
+            for a_slice, rf_slice in zip(zip(starts, stops, steps), rf_slices):
+                self.assertEqual(
+                    slice(*rf_slice),
+                    format.reformat_slice(slice(*a_slice), size)
+                )
+
+        lengths = numpy.ma.masked_array([10, 0, 3], mask=[False, True, False])
+        starts = numpy.ma.masked_array([-2, 0, -4], mask=[False, True, False])
+        stops = numpy.ma.masked_array([0, 0, 0], mask=[True, True, True])
+        steps = numpy.array([-1, 1, -1])
+
+        rf_slices = format.reformat_slice_arrays(starts, stops, steps, lengths)
+        rf_slices = zip(*[e.tolist() for e in rf_slices])
+
+        self.assertEqual(
+            [slice(*e) for e in rf_slices],
+            [format.reformat_slice(slice(-2, None, -1), 10),
+             format.reformat_slice(slice(None, None, 1)),
+             format.reformat_slice(slice(-4, None, -1), 3)]
+        )
+
+
+    def test_reformat_slice_ndarray(self):
+        for each_array in [numpy.array([[0, 1]]),
+                           numpy.array([0.0, 1.0]),
+                           numpy.array([True, False])]:
+            with self.assertRaises(TypeError) as e:
+                format.reformat_slice(each_array)
+
+            self.assertEqual(
+                str(e.exception),
+                "Arbitrary sequences not permitted."
+                " All elements must be of integral type."
+            )
+
+        with self.assertRaises(IndexError) as e:
+            format.reformat_slice(numpy.array([0, 10]), 10)
+
+        self.assertEqual(str(e.exception), "Index out of range.")
+
+        with self.assertRaises(IndexError) as e:
+            format.reformat_slice(numpy.array([0, -11]), 10)
+
+        self.assertEqual(str(e.exception), "Index out of range.")
+
+        rf_slice = format.reformat_slice(numpy.array([], dtype=float), 10)
+        self.assertIsInstance(rf_slice, numpy.ndarray)
+        self.assertEqual(rf_slice.tolist(), [])
+
+        for size in [10, 11, 12]:
+            each_range = numpy.arange(size)
+            for each_dtype in [numpy.int8, numpy.int64, numpy.uint16]:
+                a_slice = numpy.array(
+                    [i % size for i in irange(-size, size)]
+                ).astype(each_dtype)
+                if not issubclass(each_dtype, numpy.unsignedinteger):
+                    a_slice = numpy.arange(-size, size, dtype=each_dtype)
+
+                rf_slice = format.reformat_slice(a_slice)
+                self.assertIsInstance(rf_slice, numpy.ndarray)
+                self.assertEqual(rf_slice.tolist(), a_slice.tolist())
+
+                rf_slice = format.reformat_slice(a_slice, size)
+                self.assertIsInstance(rf_slice, numpy.ndarray)
+                self.assertEqual(
+                    rf_slice.tolist(),
+                    format.reformat_slice(a_slice.tolist(), size)
+                )
+                self.assertEqual(
+                    each_range[rf_slice].tolist(),
+                    each_range[a_slice].tolist()
+                )
+
+        rf_slices = format.reformat_slices(
+            (Ellipsis, numpy.array([0, -1, 3])), (4, 5)
+        )
+        self.assertEqual(rf_slices[0], slice(0, 4, 1))
+        self.assertEqual(rf_slices[1].tolist(), [0, 4, 3])
+
+        rf_slices = format.reformat_slices(numpy.array([0, -1, 3]), 5)
+        self.assertEqual(len(rf_slices), 1)
+        self.assertEqual(rf_slices[0].tolist(), [0, 4, 3])
+
+        rf_slices = format.reformat_slices(
+            (numpy.array([0, -1]), [0, -1]), (3, 4)
+        )
+        self.assertEqual(rf_slices[0].tolist(), [0, 2])
+        self.assertEqual(rf_slices[1], [0, 3])
+
+        with self.assertRaises(ValueError) as e:
+            format.reformat_slices(
+                (numpy.array([0, 1]), Ellipsis, numpy.array([0, 1]), Ellipsis),
+            )
+
+        self.assertEqual(
+            str(e.exception),
+            "Only one Ellipsis is permitted. Found multiple."
+        )
+
+        a_slices = (3, numpy.array([0, 1, 2, -1]), slice(2, 5))
+        self.assertEqual(
+            format.split_indices(a_slices),
+            format.split_indices((3, [0, 1, 2, -1], slice(2, 5)))
+        )
+        self.assertEqual(
+            format.split_indices(a_slices, coalesce=True),
+            format.split_indices((3, [0, 1, 2, -1], slice(2, 5)), True)
+        )
+
+
+    def test_range_to_slice(self):
+        for size in [10, 11, 12]:
+            excess = size + 3
+            each_range = list(irange(size))
+
+            for start in irange(-excess, excess):
+                for stop in irange(-excess, excess):
+                    for step in irange(-excess, excess):
+                        if step == 0:
+                            continue
+
+                        a_range = irange(start, stop, step)
+
+                        rf_slice = format.range_to_slice(a_range)
+                        if (start < 0) == (a_range[-1] < 0 if a_range else 0):
+                            self.assertIsInstance(rf_slice, slice)
+
+                        if all(-size <= i < size for i in a_range):
+                            expected = [each_range[i] for i in a_range]
+
+                            self.assertEqual(
+                                each_range[rf_slice]
+                                if isinstance(rf_slice, slice) else
+                                [each_range[i] for i in rf_slice],
+                                expected
+                            )
+
+                            rf_slice = format.range_to_slice(a_range, size)
+                            if isinstance(rf_slice, slice):
+                                self.assertEqual(
+                                    rf_slice,
+                                    format.reformat_slice(rf_slice, size)
+                                )
+                                self.assertEqual(
+                                    each_range[rf_slice], expected
+                                )
+                            else:
+                                self.assertEqual(rf_slice, expected)
+
+                            self.assertEqual(
+                                format.reformat_slice(a_range, size),
+                                rf_slice
+                            )
+                        else:
+                            with self.assertRaises(IndexError):
+                                format.range_to_slice(a_range, size)
+
+
+    def test_reformat_slices_range(self):
+        rf_slices = format.reformat_slices(
+            (range(0, 10**8, 3), 0, Ellipsis, range(-1, -4, -1)),
+            (10**8, 5, 2, 7)
+        )
+        self.assertEqual(
+            rf_slices,
+            (slice(0, 10**8, 3), 0, slice(0, 2, 1), slice(6, 3, -1))
+        )
+
+        sp_slices = format.split_indices(
+            (range(0, 10**8, 3), 0, Ellipsis, [2, 3])
+        )
+        self.assertEqual(
+            sp_slices,
+            [(slice(0, 10**8 + 2, 3), 0, Ellipsis, slice(2, 3, 1)),
+             (slice(0, 10**8 + 2, 3), 0, Ellipsis, slice(3, 4, 1))]
+        )
+
+
+    def test_normalized_slice(self):
+        with self.assertRaises(TypeError) as e:
+            format.NormalizedSlice(3, 10)
+
+        self.assertEqual(
+            str(e.exception),
+            "Expected a slice. Instead got `3`."
+        )
+
+        with self.assertRaises(ValueError) as e:
+            format.NormalizedSlice(slice(None, None, 0), 10)
+
+        self.assertEqual(
+            str(e.exception),
+            "Slice cannot have a step size of `0`."
+        )
+
+        for size in [10, 11, 12]:
+            excess = size + 3
+            each_range = range(size)
+
+            for start in itertools.chain([None], irange(-excess, excess)):
+                for stop in itertools.chain([None], irange(-excess, excess)):
+                    for step in itertools.chain(irange(-excess, excess)):
+                        step = None if step == 0 else step
+
+                        a_slice = slice(start, stop, step)
+                        rf_slice = format.reformat_slice(a_slice, size)
+
+                        n_slice = format.NormalizedSlice(a_slice, size)
+                        self.assertEqual(n_slice, rf_slice)
+                        self.assertEqual(rf_slice, n_slice)
+                        self.assertFalse(n_slice != rf_slice)
+                        self.assertEqual(n_slice.as_slice(), rf_slice)
+                        self.assertEqual(
+                            len(n_slice), len(each_range[a_slice])
+                        )
+                        self.assertEqual(
+                            hash(n_slice),
+                            hash(format.NormalizedSlice(rf_slice, size))
+                        )
+
+                        self.assertIsInstance(
+                            format.reformat_slice(n_slice, size), slice
+                        )
+                        self.assertEqual(
+                            format.reformat_slice(n_slice, size), rf_slice
+                        )
+                        self.assertEqual(
+                            format.NormalizedSlice(n_slice, size), n_slice
+                        )
+
+        n_slices = {
+            format.NormalizedSlice(slice(None), 10): 0,
+            format.NormalizedSlice(slice(0, 10), 10): 1,
+            format.NormalizedSlice(slice(None, None, -1), 10): 2,
+        }
+        self.assertEqual(len(n_slices), 2)
+        self.assertEqual(
+            n_slices[format.NormalizedSlice(slice(0, 10, 1), 10)], 1
+        )
+
+        self.assertNotEqual(format.NormalizedSlice(slice(None), 10), 3)
+
+        rf_slices = format.reformat_slices(
+            (format.NormalizedSlice(slice(2, None), 10), Ellipsis), (10, 5)
+        )
+        self.assertIsInstance(rf_slices[0], slice)
+        self.assertEqual(rf_slices, (slice(2, 10, 1), slice(0, 5, 1)))
+
+        # Normalized again when used with a different length.
+        n_slice = format.NormalizedSlice(slice(None))
+        self.assertEqual(
+            format.reformat_slice(n_slice, 10), slice(0, 10, 1)
+        )
+        self.assertEqual(
+            format.NormalizedSlice(n_slice, 10), slice(0, 10, 1)
+        )
+
+        n_slice = format.NormalizedSlice(slice(None), 10)
+        self.assertEqual(
+            format.reformat_slice(n_slice, 5), slice(0, 5, 1)
+        )
+
+        # The slice given is normalized again, not the normalized values.
+        for a_slice in [slice(-3, None), slice(None, -2, -1), slice(2, 8)]:
+            for size in [5, 10, 12]:
+                for n_size in [None, 5, 10, 12]:
+                    other = format.NormalizedSlice(a_slice, n_size)
+                    self.assertEqual(
+                        format.reformat_slice(other, size),
+                        format.reformat_slice(a_slice, size)
+                    )
+                    self.assertEqual(
+                        format.NormalizedSlice(other, size),
+                        format.reformat_slice(a_slice, size)
+                    )
+        self.assertEqual(
+            format.reformat_slice(
+                format.NormalizedSlice(slice(-3, None), 10), 5
+            ),
+            slice(2, 5, 1)
+        )
+        self.assertEqual(
+            format.reformat_slices((n_slice, n_slice), (10, 5)),
+            (slice(0, 10, 1), slice(0, 5, 1))
+        )
+
+        a = numpy.arange(50).reshape(10, 5)
+        self.assertTrue(
+            (a[format.reformat_slices((n_slice, 2), a.shape)] ==
+             a[:, 2]).all()
+        )
+
+        self.assertEqual(
+            format.split_indices(
+                (format.NormalizedSlice(slice(0, 5), 10), [0, 1, 5]), True
+            ),
+            format.split_indices((slice(0, 5), [0, 1, 5]), True)
+        )
@@ -12,6 +12,9 @@ import operator
 import sys
 import unittest
 
+import numpy
+
+from kenjutsu import format
 from kenjutsu import measure
 
 
@@ -206,6 +209,195 @@ class TestMeasure(unittest.TestCase):
         )
 
 
+    def test_len_normalized_slice(self):
+        with self.assertRaises(measure.UnknownSliceLengthException):
+            measure.len_slice(format.NormalizedSlice(slice(None)))
+
+        self.assertEqual(
+            measure.len_slice(format.NormalizedSlice(slice(None)), 10), 10
+        )
+        self.assertEqual(
+            measure.len_slice(format.NormalizedSlice(slice(-3, None), 10), 5),
+            3
+        )
+        self.assertEqual(
+            measure.len_slices((format.NormalizedSlice(slice(None)),), (10,)),
+            (10,)
+        )
+
+        for size in [10, 11, 12]:
+            excess = size + 3
+            each_range = range(size)
+            for start in itertools.chain([None], irange(-excess, excess)):
+                for stop in itertools.chain([None], irange(-excess, excess)):
+                    for step in itertools.chain(irange(-excess, excess)):
+                        step = None if step == 0 else step
+
+                        a_slice = slice(start, stop, step)
+                        n_slice = format.NormalizedSlice(a_slice, size)
+
+                        self.assertEqual(
+                            measure.len_slice(n_slice, size),
+                            len(each_range[a_slice])
+                        )
+
+                        self.assertEqual(
+                            measure.len_slices((n_slice, 0), (size, 1)),
+                            (len(each_range[a_slice]),)
+                        )
+
+
+    def test_len_slice_exact(self):
+        size = 2**62 + 1
+        self.assertEqual(measure.len_slice(slice(None), size), size)
+        self.assertEqual(
+            measure.len_slice(slice(1, None, 3), size),
+            -(-2**62 // 3)
+        )
+        self.assertEqual(
+            measure.len_slice(slice(None, None, -7), size),
+            (size + 6) // 7
+        )
+
+
+    def test_len_slice_arrays(self):
+        with self.assertRaises(measure.UnknownSliceLengthException):
+            measure.len_slice_arrays(
+                numpy.ma.masked_all((2,), dtype=int),
+                numpy.ma.masked_all((2,), dtype=int),
+                numpy.array([1, -1])
+            )
+
+        for size in [10, 11, 12]:
+            excess = size + 3
+            values = list(itertools.chain([None], irange(-excess, excess)))
+            steps = [e for e in irange(-excess, excess) if e != 0] + [None]
+
+            a_slices = list(itertools.product(values, values, steps))
+            starts, stops, steps = [
+                numpy.array(e, dtype=object) for e in zip(*a_slices)
+            ]
+
+            result = measure.len_slice_arrays(starts, stops, steps, size)
+            expected = [
+                measure.len_slice(slice(*e), size) for e in a_slices
+            ]
+            self.assertEqual(result.tolist(), expected)
+
+        values = list(itertools.chain([None], irange(-5, 5)))
+        steps = [e for e in irange(-5, 5) if e != 0] + [None]
+        for each_slice in itertools.product(values, values, steps):
+            each_arrays = [
+                numpy.array([e], dtype=object) for e in each_slice
+            ]
+            try:
+                expected = [measure.len_slice(slice(*each_slice))]
+            except measure.UnknownSliceLengthException:
+                with self.assertRaises(measure.UnknownSliceLengthException):
+                    measure.len_slice_arrays(*each_arrays)
+            else:
+                self.assertEqual(
+                    measure.len_slice_arrays(*each_arrays).tolist(),
+                    expected
+                )
+
+        size = 2**62 + 1
+        self.assertEqual(
+            measure.len_slice_arrays(
+                numpy.array([0, 1, -1]),
+                numpy.ma.masked_equal([-1, -1, -1], -1),
+                numpy.array([1, 3, -7]),
+                size
+            ).tolist(),
+            [size, -(-2**62 // 3), (size + 6) // 7]
+        )
+
+
+    def test_selection_shape(self):
+        shape = (7, 8, 9)
+        a = numpy.zeros(shape, dtype=numpy.int16)
+
+        for each_slices in [
+                Ellipsis,
+                tuple(),
+                (2,),
+                (slice(None, None, -1), -1),
+                (slice(None, None, -2), 3, slice(8, 0, -3)),
+                (2, [6, 3, 1], slice(1, None, 2)),
+                (slice(5, 2), Ellipsis, slice(2, 5, -1)),
+                (0, 1, 2)]:
+            self.assertEqual(
+                measure.selection_shape(each_slices, shape),
+                a[each_slices].shape
+            )
+            self.assertEqual(
+                measure.selection_nbytes(each_slices, shape, a.dtype),
+                a[each_slices].nbytes
+            )
+
+        self.assertEqual(
+            measure.selection_shape(([0, 2], [1, 3, 3]), (4, 5)),
+            (2, 3)
+        )
+
+        size = 2**40
+        self.assertEqual(
+            measure.selection_nbytes(
+                (slice(None), slice(1, None, 2)), (size, size), "c16"
+            ),
+            16 * size * (size // 2)
+        )
+
+
+    def test_contiguous_runs(self):
+        with self.assertRaises(ValueError) as e:
+            measure.contiguous_runs(Ellipsis, (2, 3), 1, "A")
+
+        self.assertEqual(
+            str(e.exception),
+            "The `order` must be either \"C\" or \"F\". Instead got: A."
+        )
+
+        self.assertEqual(measure.num_contiguous_runs(Ellipsis, ()), 1)
+        offsets, nbytes = measure.contiguous_runs(Ellipsis, (), 4)
+        self.assertEqual((offsets.tolist(), nbytes.tolist()), ([0], [4]))
+
+        shape = (4, 5, 6)
+        dim_indices = [
+            slice(None), slice(1, 3), slice(None, None, -1), slice(0, 0),
+            slice(None, None, 2), 0, -1, [3, 0, 1, 2], [1, 2, 2, 3]
+        ]
+
+        for order in ["C", "F"]:
+            memory = numpy.arange(numpy.prod(shape)).reshape(
+                shape, order=order
+            )
+            for each_slices in itertools.product(*(3 * [dim_indices])):
+                expected = memory[numpy.ix_(*[
+                    numpy.arange(n)[e] if isinstance(e, slice) else
+                    numpy.array(e, dtype=int).reshape(-1)
+                    for e, n in zip(each_slices, shape)
+                ])].ravel(order=order)
+
+                first = numpy.flatnonzero(numpy.diff(expected) != 1) + 1
+                first = numpy.concatenate([[0], first])[:len(expected)]
+                expected_offsets = 8 * expected[first]
+                expected_nbytes = 8 * numpy.diff(
+                    numpy.concatenate([first, [len(expected)]])
+                )
+
+                offsets, nbytes = measure.contiguous_runs(
+                    each_slices, shape, 8, order
+                )
+                self.assertEqual(offsets.tolist(), expected_offsets.tolist())
+                self.assertEqual(nbytes.tolist(), expected_nbytes.tolist())
+
+                self.assertEqual(
+                    measure.num_contiguous_runs(each_slices, shape, order),
+                    len(expected_offsets)
+                )
+
+
     def tearDown(self):
         pass
 
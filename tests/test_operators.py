@@ -1,5 +1,274 @@
+#!/usr/bin/env python
+
+# -*- coding: utf-8 -*-
+
 __author__ = "John Kirkham <kirkhamj@janelia.hhmi.org>"
 __date__ = "$Dec 08, 2016 16:20:14 GMT-0500$"
 
 
+import doctest
+import itertools
+import sys
+import unittest
+
+import numpy
+
+from kenjutsu import format
 from kenjutsu import operators
+
+
+try:
+    irange = xrange
+except NameError:
+    irange = range
+
+
+# Load doctests from `operators`.
+def load_tests(loader, tests, ignore):
+    tests.addTests(doctest.DocTestSuite(operators))
+    return tests
+
+
+class TestOperators(unittest.TestCase):
+    def setUp(self):
+        pass
+
+
+    def test_intersect_cover(self):
+        def index_set(index, each_range):
+            if index is None:
+                return set()
+            elif isinstance(index, (int, numpy.integer)):
+                return {each_range[index]}
+            elif isinstance(index, slice):
+                return set(each_range[index])
+            else:
+                return set(each_range[i] for i in index)
+
+        for size in [11, 12]:
+            excess = size + 2
+            each_range = list(irange(size))
+
+            values = list(itertools.chain([None], irange(-excess, excess, 5)))
+            steps = [None, -4, -3, 1, 2, 6]
+            indices = [
+                slice(*e) for e in itertools.product(values, values, steps)
+            ]
+            indices += [0, -1, 5, [], [3, 1, 3], [-1, 9, 0]]
+
+            for a in indices:
+                a_set = index_set(a, each_range)
+                for b in indices:
+                    b_set = index_set(b, each_range)
+
+                    result = operators.intersect(a, b, size)
+                    if a_set & b_set:
+                        self.assertEqual(
+                            index_set(result, each_range), a_set & b_set
+                        )
+                        if isinstance(result, slice):
+                            self.assertGreater(result.step, 0)
+                    else:
+                        self.assertIsNone(result)
+
+                    result = operators.cover(a, b, size)
+                    union = a_set | b_set
+                    if not union:
+                        self.assertIsNone(result)
+                        continue
+
+                    result_set = index_set(result, each_range)
+                    self.assertTrue(union <= result_set)
+                    self.assertEqual(min(result_set), min(union))
+                    self.assertEqual(max(result_set), max(union))
+                    if isinstance(result, slice):
+                        expected_step = 0
+                        for i in union:
+                            expected_step = operators.gcd(
+                                expected_step, i - min(union)
+                            )
+                        self.assertEqual(result.step, expected_step or 1)
+
+
+    def test_intersect_cover_slices(self):
+        shape = (7, 5, 6)
+        a = numpy.arange(numpy.prod(shape)).reshape(shape)
+
+        for a_slices, b_slices in [
+                (Ellipsis, Ellipsis),
+                ((slice(None, None, 2), 3), (slice(None, None, -3), [3, 0])),
+                ((slice(None, None, -3), Ellipsis, -1), (0,)),
+                ((1, slice(1, 4), slice(5, 0, -2)), (1, 1, slice(1, 6, 2))),
+                ((1, [4, 0, 2]), (2, slice(1, None, 4))),
+                ((slice(1, 1),), (slice(None),))]:
+            a_set = set(a[format.reformat_slices(a_slices, shape)].flat)
+            b_set = set(a[format.reformat_slices(b_slices, shape)].flat)
+
+            result = operators.intersect_slices(a_slices, b_slices, shape)
+            if a_set & b_set:
+                self.assertEqual(set(a[result].flat), a_set & b_set)
+            else:
+                self.assertIsNone(result)
+
+            result = operators.cover_slices(a_slices, b_slices, shape)
+            if a_set | b_set:
+                self.assertTrue((a_set | b_set) <= set(a[result].flat))
+            else:
+                self.assertIsNone(result)
+
+        self.assertIsNone(
+            operators.cover_slices((slice(1, 1),), (slice(2, 2),), (5,))
+        )
+
+
+    def test_compose(self):
+        with self.assertRaises(TypeError) as e:
+            operators.compose(3, slice(None), 10)
+
+        self.assertEqual(
+            str(e.exception),
+            "Cannot apply an index after an integral index."
+            " Instead got `3` as the outer index."
+        )
+
+        with self.assertRaises(IndexError):
+            operators.compose(slice(2, 5), 3, 10)
+
+        for size in [10, 11]:
+            excess = size + 2
+            each_range = list(irange(size))
+
+            values = list(itertools.chain([None], irange(-excess, excess, 4)))
+            steps = [None, -3, -1, 2]
+            slices = [
+                slice(*e) for e in itertools.product(values, values, steps)
+            ]
+
+            for outer in slices:
+                outer_range = each_range[outer]
+                for inner in itertools.chain(
+                        slices, irange(-3, 3), [[0, -1, 1], []]):
+                    try:
+                        if isinstance(inner, list):
+                            expected = [outer_range[i] for i in inner]
+                        else:
+                            expected = outer_range[inner]
+                    except IndexError:
+                        with self.assertRaises(IndexError):
+                            operators.compose(outer, inner, size)
+                        continue
+
+                    result = operators.compose(outer, inner, size)
+                    if isinstance(result, slice):
+                        self.assertEqual(
+                            result, format.reformat_slice(result, size)
+                        )
+                        self.assertEqual(each_range[result], expected)
+                    elif isinstance(result, list):
+                        self.assertEqual(
+                            [each_range[i] for i in result], expected
+                        )
+                    else:
+                        self.assertEqual(each_range[result], expected)
+
+                    result = operators.compose(
+                        [i - size for i in outer_range], inner, size
+                    )
+                    if isinstance(result, list):
+                        result = [each_range[i] for i in result]
+                    else:
+                        result = each_range[result]
+                    self.assertEqual(result, expected)
+
+        result = operators.compose(
+            slice(1, None, 3), numpy.array([2, 0]), 10
+        )
+        self.assertIsInstance(result, numpy.ndarray)
+        self.assertEqual(result.tolist(), [7, 1])
+
+        result = operators.compose(
+            numpy.array([3, 1, 4]), slice(None, None, -1), 10
+        )
+        self.assertEqual(result.tolist(), [4, 1, 3])
+
+        result = operators.compose(
+            slice(1, None, 3), format.NormalizedSlice(slice(1, None), 3), 10
+        )
+        self.assertEqual(result, slice(4, 10, 3))
+
+
+    def test_compose_slices(self):
+        shape = (7, 5, 6)
+        a = numpy.arange(numpy.prod(shape)).reshape(shape)
+
+        for outer, inner in [
+                (Ellipsis, Ellipsis),
+                ((slice(None, None, 2), 3), (slice(None, None, -1), [4, 0])),
+                ((slice(None, None, -3), Ellipsis, -1), (0,)),
+                ((1, slice(1, 4), slice(5, 0, -2)), (slice(1, None), 1)),
+                ((1, [4, 0, 2]), (-1, slice(1, None, 4))),
+                ((Ellipsis, slice(1, 2)), (slice(2, 4), Ellipsis, 0))]:
+            result = operators.compose_slices(outer, inner, shape)
+            self.assertEqual(
+                a[result].tolist(),
+                a[format.reformat_slices(outer, shape)][
+                    format.reformat_slices(inner, a[outer].shape)
+                ].tolist()
+            )
+
+
+    def test_forward_slice(self):
+        for size in [10, 11]:
+            excess = size + 3
+            each_range = list(irange(size))
+            indices = list(itertools.chain([None], irange(-excess, excess, 2)))
+            for start in indices:
+                for stop in indices:
+                    for step in [-5, -2, -1, 1, 3]:
+                        a_slice = slice(start, stop, step)
+                        expected = each_range[a_slice]
+
+                        result, flip = operators.forward_slice(a_slice, size)
+                        self.assertGreater(result.step, 0)
+
+                        result = each_range[result]
+                        if flip:
+                            result = result[::-1]
+                        self.assertEqual(result, expected)
+
+        self.assertEqual(operators.forward_slice(-2, 10), (8, False))
+        self.assertEqual(
+            operators.forward_slice([2, 5, 1], 10), ([2, 5, 1], False)
+        )
+        self.assertEqual(
+            operators.forward_slice([5, 5], 10), ([5, 5], False)
+        )
+        self.assertEqual(operators.forward_slice([-1, 3], 10), ([3, 9], True))
+
+
+    def test_forward_slices(self):
+        shape = (7, 8, 9)
+        a = numpy.arange(numpy.prod(shape)).reshape(shape)
+
+        for each_slices in [
+                Ellipsis,
+                (slice(None, None, -1),),
+                (slice(None, None, -2), 3, slice(8, 0, -3)),
+                (2, [6, 3, 1], slice(1, None, 2)),
+                (slice(5, 2), Ellipsis, slice(2, 5, -1))]:
+            result, flips = operators.forward_slices(each_slices, shape)
+            self.assertEqual(len(flips), a[each_slices].ndim)
+
+            result = a[result][tuple(
+                slice(None, None, -1) if e else slice(None) for e in flips
+            )]
+            self.assertTrue(numpy.array_equal(result, a[each_slices]))
+
+
+    def tearDown(self):
+        pass
+
+
+
+if __name__ == '__main__':
+    sys.exit(unittest.main())
@@ -0,0 +1,230 @@
+#!/usr/bin/env python
+
+# -*- coding: utf-8 -*-
+
+__author__ = "John Kirkham <kirkhamj@janelia.hhmi.org>"
+__date__ = "$Oct 18, 2026 01:03:35 GMT+0000$"
+
+
+import concurrent.futures
+import doctest
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+import numpy
+
+from kenjutsu import blocks
+from kenjutsu import parallel
+
+
+# Load doctests from `parallel`.
+def load_tests(loader, tests, ignore):
+    tests.addTests(doctest.DocTestSuite(parallel))
+    return tests
+
+
+def box_sum(a):
+    # Sums each point with its neighbors (within the halo).
+    result = numpy.zeros_like(a)
+    for i in range(-1, 2):
+        for j in range(-1, 2):
+            result[1:-1, 1:-1] += a[1 + i:a.shape[0] - 1 + i,
+                                    1 + j:a.shape[1] - 1 + j]
+    return result
+
+
+def box_sum_padded(a):
+    # Pads the edges of the array so each block is summed the same way.
+    return box_sum(numpy.pad(a, 1, mode="constant"))[1:-1, 1:-1]
+
+
+class RecordingExecutor(concurrent.futures.ProcessPoolExecutor):
+    # Records the shape of each result sent back.
+    def __init__(self, *args, **kwargs):
+        super(RecordingExecutor, self).__init__(*args, **kwargs)
+        self.shapes = []
+
+    def submit(self, *args, **kwargs):
+        future = super(RecordingExecutor, self).submit(*args, **kwargs)
+        future.add_done_callback(
+            lambda f: self.shapes.append(f.result().shape)
+        )
+        return future
+
+
+class TestParallel(unittest.TestCase):
+    def setUp(self):
+        self.a = numpy.random.RandomState(0).random_sample((20, 30))
+
+        padded = numpy.pad(self.a, 1, mode="constant")
+        self.expected = box_sum(padded)[1:-1, 1:-1]
+
+        self.grid = blocks.BlockGrid(self.a.shape, (5, 6), (1, 1))
+
+
+    def test_map_blocks(self):
+        for executor in ["thread", "process"]:
+            for each_blocks in [self.grid,
+                                list(self.grid),
+                                zip(*blocks.split_blocks(
+                                    self.a.shape, (5, 6), (1, 1)
+                                ))]:
+                b = numpy.zeros_like(self.a)
+                result = parallel.map_blocks(
+                    box_sum_padded, self.a, b, each_blocks,
+                    executor=executor, max_workers=2
+                )
+                self.assertIs(result, b)
+                self.assertTrue(numpy.allclose(b, self.expected))
+
+        with concurrent.futures.ThreadPoolExecutor(2) as executor:
+            b = numpy.zeros_like(self.a)
+            parallel.map_blocks(
+                box_sum_padded, self.a, b, self.grid, executor=executor
+            )
+            self.assertTrue(numpy.allclose(b, self.expected))
+
+        # Only the trimmed results are sent back.
+        with RecordingExecutor(2) as executor:
+            b = numpy.zeros_like(self.a)
+            parallel.map_blocks(
+                box_sum_padded, self.a, b, self.grid, executor=executor
+            )
+            self.assertTrue(numpy.allclose(b, self.expected))
+        self.assertEqual(
+            sorted(executor.shapes),
+            sorted(b[e.core].shape for e in self.grid)
+        )
+
+        with self.assertRaises(TypeError):
+            parallel.map_blocks(
+                box_sum_padded, self.a, self.a.copy(), self.grid, "fiber"
+            )
+
+        with self.assertRaises(ValueError):
+            parallel.map_blocks(
+                box_sum_padded, self.a, self.a.copy(), self.grid,
+                max_in_flight=0
+            )
+
+
+    def test_map_blocks_shared(self):
+        for executor in ["thread", "process"]:
+            with parallel.SharedArray(self.a.shape, self.a.dtype) as b:
+                result = parallel.map_blocks(
+                    box_sum_padded, self.a, b, self.grid,
+                    executor=executor, max_workers=2
+                )
+                self.assertIs(result, b)
+                self.assertTrue(numpy.allclose(b.array, self.expected))
+
+        shared_memory = parallel.shared_memory
+        try:
+            parallel.shared_memory = None
+
+            with parallel.SharedArray(self.a.shape, self.a.dtype) as b:
+                self.assertIsInstance(b.array, numpy.memmap)
+                filename = b.array.filename
+                parallel.map_blocks(
+                    box_sum_padded, self.a, b, self.grid,
+                    executor="process", max_workers=2
+                )
+                self.assertTrue(numpy.allclose(b.array, self.expected))
+            self.assertFalse(os.path.exists(filename))
+        finally:
+            parallel.shared_memory = shared_memory
+
+        temp_dir = tempfile.mkdtemp()
+        try:
+            b = numpy.memmap(
+                os.path.join(temp_dir, "b.dat"),
+                self.a.dtype, "w+", shape=self.a.shape
+            )
+            self.assertIsNotNone(parallel._shared_target(b))
+            self.assertIsNone(parallel._shared_target(b[1:]))
+
+            parallel.map_blocks(
+                box_sum_padded, self.a, b, self.grid,
+                executor="process", max_workers=2
+            )
+            self.assertTrue(numpy.allclose(b, self.expected))
+            del b
+        finally:
+            shutil.rmtree(temp_dir)
+
+        # Nothing is kept open in workers between calls.
+        temp_dir = tempfile.mkdtemp()
+        filename = os.path.join(temp_dir, "b.dat")
+        try:
+            with concurrent.futures.ProcessPoolExecutor(2) as executor:
+                for i in range(2):
+                    b = numpy.memmap(
+                        filename, self.a.dtype, "w+", shape=self.a.shape
+                    )
+                    parallel.map_blocks(
+                        box_sum_padded, i + self.a, b, self.grid,
+                        executor=executor
+                    )
+                    self.assertTrue(
+                        numpy.allclose(b, box_sum_padded(i + self.a))
+                    )
+                    del b
+                    os.remove(filename)
+
+                for i in range(2):
+                    with parallel.SharedArray(
+                            self.a.shape, self.a.dtype) as b:
+                        parallel.map_blocks(
+                            box_sum_padded, i + self.a, b, self.grid,
+                            executor=executor
+                        )
+                        self.assertTrue(numpy.allclose(
+                            b.array, box_sum_padded(i + self.a)
+                        ))
+        finally:
+            shutil.rmtree(temp_dir)
+
+
+    def test_map_blocks_in_flight(self):
+        lock = threading.Lock()
+        counts = {"running": 0, "most": 0}
+
+        def func(a):
+            with lock:
+                counts["running"] += 1
+                counts["most"] = max(counts["most"], counts["running"])
+            time.sleep(0.01)
+            with lock:
+                counts["running"] -= 1
+            return a
+
+        b = numpy.zeros_like(self.a)
+        parallel.map_blocks(
+            func, self.a, b, self.grid, max_workers=4, max_in_flight=2
+        )
+        self.assertTrue(numpy.array_equal(b, self.a))
+        self.assertLessEqual(counts["most"], 2)
+
+
+    def test_map_blocks_error(self):
+        def func(a):
+            raise RuntimeError("Failed on a block.")
+
+        with self.assertRaises(RuntimeError):
+            parallel.map_blocks(
+                func, self.a, numpy.zeros_like(self.a), self.grid
+            )
+
+
+    def tearDown(self):
+        pass
+
+
+
+if __name__ == '__main__':
+    sys.exit(unittest.main())
@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+
+# -*- coding: utf-8 -*-
+
+__author__ = "John Kirkham <kirkhamj@janelia.hhmi.org>"
+__date__ = "$Oct 18, 2026 00:50:23 GMT+0000$"
+
+
+import doctest
+import sys
+import unittest
+
+import numpy
+
+from kenjutsu import format
+from kenjutsu import plan
+
+
+try:
+    irange = xrange
+except NameError:
+    irange = range
+
+
+# Load doctests from `plan`.
+def load_tests(loader, tests, ignore):
+    tests.addTests(doctest.DocTestSuite(plan))
+    return tests
+
+
+class TestPlan(unittest.TestCase):
+    def setUp(self):
+        pass
+
+
+    def test_plan_reads(self):
+        with self.assertRaises(ValueError) as e:
+            plan.plan_reads([], (10,), -1)
+
+        self.assertEqual(
+            str(e.exception),
+            "The `gap` must be positive semidefinite. Instead got: -1."
+        )
+
+        self.assertEqual(plan.plan_reads([], (10,)), ([], []))
+
+        self.assertEqual(
+            plan.plan_reads([(slice(3, 3),)], (10,)),
+            ([], [(None, None)])
+        )
+
+        reads, scatter = plan.plan_reads(
+            [(slice(0, 4),), (slice(2, 6),), (slice(6, 8),), (9,)], (10,)
+        )
+        self.assertEqual(reads, [(slice(0, 8, 1),), (slice(9, 10, 1),)])
+        self.assertEqual(
+            [e[0] for e in scatter],
+            [0, 0, 0, 1]
+        )
+
+        shape = (12, 13)
+        a = numpy.arange(numpy.prod(shape)).reshape(shape)
+
+        selections = [
+            (slice(0, 3), slice(0, 4)),
+            (slice(1, 4), slice(2, 6)),
+            (slice(3, 5), slice(4, 6)),
+            (slice(10, 5, -2), 7),
+            (11, [12, 10, 11]),
+            ([0, 2, 1], slice(None, None, -5)),
+            (slice(9, 9), slice(None)),
+        ]
+
+        n_reads = []
+        for gap in [0, 2, 10, 50, 1000]:
+            reads, scatter = plan.plan_reads(selections, shape, gap)
+            n_reads.append(len(reads))
+
+            self.assertEqual(len(scatter), len(selections))
+            self.assertEqual(reads, sorted(
+                reads, key=lambda r: tuple((e.start, e.stop) for e in r)
+            ))
+
+            for each_selection, (i, each_local) in zip(selections, scatter):
+                expected = a[each_selection]
+                if i is None:
+                    self.assertEqual(expected.size, 0)
+                    continue
+
+                result = a[reads[i]][each_local]
+                self.assertTrue(numpy.array_equal(result, expected))
+
+        self.assertEqual(n_reads, sorted(n_reads, reverse=True))
+        self.assertEqual(n_reads[-1], 1)
+
+        # Overlapping boxes are merged even when that reads more.
+        reads, scatter = plan.plan_reads(
+            [(slice(0, 2), slice(0, 2)), (slice(1, 3), slice(1, 3))], (5, 5)
+        )
+        self.assertEqual(reads, [(slice(0, 3, 1), slice(0, 3, 1))])
+        self.assertEqual(
+            scatter,
+            [(0, (slice(0, 2, 1), slice(0, 2, 1))),
+             (0, (slice(1, 3, 1), slice(1, 3, 1)))]
+        )
+
+        reads, scatter = plan.plan_reads(
+            [(slice(0, 2), slice(0, 2)), (slice(2, 4), slice(2, 4))], (5, 5)
+        )
+        self.assertEqual(len(reads), 2)
+
+        reads, scatter = plan.plan_reads(
+            [(slice(3 * i, 3 * i + 2), 0) for i in irange(2000)], (6000, 2)
+        )
+        self.assertEqual(len(reads), 2000)
+        self.assertEqual([e[0] for e in scatter], list(irange(2000)))
+
+        reads, scatter = plan.plan_reads(
+            [(slice(3 * i, 3 * i + 2), 0) for i in irange(2000)], (6000, 2),
+            gap=1
+        )
+        self.assertEqual(reads, [(slice(0, 5999, 1), slice(0, 1, 1))])
+
+        self.assertEqual(
+            plan.plan_reads(
+                [(format.NormalizedSlice(slice(2, 5), 12), 3)], shape
+            ),
+            plan.plan_reads([(slice(2, 5), 3)], shape)
+        )
+
+
+    def tearDown(self):
+        pass
+
+
+
+if __name__ == '__main__':
+    sys.exit(unittest.main())
@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+
+# -*- coding: utf-8 -*-
+
+__author__ = "John Kirkham <kirkhamj@janelia.hhmi.org>"
+__date__ = "$Oct 18, 2026 00:59:03 GMT+0000$"
+
+
+import doctest
+import io
+import itertools
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import numpy
+
+from kenjutsu import reader
+
+
+# Load doctests from `reader`.
+def load_tests(loader, tests, ignore):
+    tests.addTests(doctest.DocTestSuite(reader))
+    return tests
+
+
+def outer(a, slices):
+    # Applies each index independently of the others.
+    result = a[numpy.ix_(*[
+        numpy.arange(n)[e] if isinstance(e, slice) else
+        numpy.array(e, dtype=int).reshape(-1)
+        for e, n in zip(slices, a.shape)
+    ])]
+
+    return result[tuple(
+        0 if isinstance(e, int) else slice(None) for e in slices
+    )]
+
+
+class TestReader(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+        self.shape = (5, 6, 7)
+        self.a = numpy.arange(
+            numpy.prod(self.shape), dtype=numpy.float32
+        ).reshape(self.shape)
+
+        self.dim_indices = [
+            slice(None), slice(1, 4), slice(None, None, -2), slice(2, 2),
+            0, -1, [4, 0, 1, 2], [3, 2, 1]
+        ]
+
+
+    def test_read_raw(self):
+        filename = os.path.join(self.temp_dir, "a.bin")
+        offset = 13
+        for order in ["C", "F"]:
+            with io.open(filename, "wb") as f:
+                f.write(offset * b"\0")
+                f.write(self.a.tobytes(order=order))
+
+            for each_slices in itertools.product(*(3 * [self.dim_indices])):
+                expected = outer(self.a, each_slices)
+                for gap in [0, 16, 1000]:
+                    result = reader.read_raw(
+                        filename, each_slices, self.shape, self.a.dtype,
+                        order=order, offset=offset, gap=gap
+                    )
+                    self.assertEqual(result.dtype, expected.dtype)
+                    self.assertTrue(numpy.array_equal(result, expected))
+
+        with self.assertRaises(ValueError) as e:
+            reader.read_raw(filename, Ellipsis, self.shape, "f4", gap=-1)
+
+        self.assertEqual(
+            str(e.exception),
+            "The `gap` must be positive semidefinite. Instead got: -1."
+        )
+
+        with self.assertRaises(EOFError):
+            reader.read_raw(filename, Ellipsis, (10,) + self.shape, "f4")
+
+
+    def test_read_raw_fallback(self):
+        filename = os.path.join(self.temp_dir, "a.bin")
+        self.a.tofile(filename)
+
+        preadv = reader._preadv
+        try:
+            reader._preadv = None
+
+            with io.open(filename, "rb") as f:
+                for each_slices in [Ellipsis, (0, [4, 0, 1], slice(1, 6, 2))]:
+                    for gap in [0, 1000]:
+                        result = reader.read_raw(
+                            f, each_slices, self.shape, self.a.dtype, gap=gap
+                        )
+                        self.assertTrue(
+                            numpy.array_equal(result, self.a[each_slices])
+                        )
+
+                with self.assertRaises(EOFError):
+                    reader.read_raw(f, Ellipsis, (10,) + self.shape, "f4")
+        finally:
+            reader._preadv = preadv
+
+        # Files without a descriptor are read by seeking.
+        f = io.BytesIO(self.a.tobytes())
+        for each_slices in [Ellipsis, (0, [4, 0, 1], slice(1, 6, 2))]:
+            for gap in [0, 1 << 40]:
+                result = reader.read_raw(
+                    f, each_slices, self.shape, self.a.dtype, gap=gap
+                )
+                self.assertTrue(
+                    numpy.array_equal(result, self.a[each_slices])
+                )
+
+
+    def test_read_raw_iov_max(self):
+        batches = reader._plan_batches(
+            numpy.array([0, 4, 10, 20, 24]),
+            numpy.array([2, 2, 2, 2, 2]),
+            8,
+            4
+        )
+        self.assertEqual(
+            batches,
+            [(0, [2, -2, 2]), (10, [2, -8, 2]), (24, [2])]
+        )
+
+
+    def test_read_npy(self):
+        for order in ["C", "F"]:
+            filename = os.path.join(self.temp_dir, "a_%s.npy" % order)
+            numpy.save(filename, numpy.asarray(self.a, order=order))
+
+            for each_slices in itertools.product(*(3 * [self.dim_indices])):
+                self.assertTrue(numpy.array_equal(
+                    reader.read_npy(filename, each_slices, gap=64),
+                    outer(self.a, each_slices)
+                ))
+
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+
+
+if __name__ == '__main__':
+    sys.exit(unittest.main())